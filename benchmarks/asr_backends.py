@@ -0,0 +1,94 @@
+import argparse
+import contextlib
+import os
+import sys
+import time
+from benchmarks.media import generate_audio
+from benchmarks.mocks import mock_models
+
+WORK_DIR = os.path.join('temp', 'bench')
+
+def check_segments(segments, duration, label, words=False):
+    failures = []
+    previous = 0.0
+    for segment in segments:
+        expected = {'start', 'end', 'text', 'words'} if words else {'start', 'end', 'text'}
+        if set(segment) != expected or not isinstance(segment['text'], str):
+            failures.append(f"{label}: malformed segment {segment}")
+            break
+        if words and any(not segment['start'] - 0.05 <= w['start'] <= w['end'] <= segment['end'] + 0.05
+                         for w in segment['words']):
+            failures.append(f"{label}: word timings fall outside segment {segment['start']:.2f}-{segment['end']:.2f}")
+            break
+        if not 0 <= segment['start'] <= segment['end'] <= duration + 0.5:
+            failures.append(f"{label}: segment {segment['start']:.2f}-{segment['end']:.2f} outside 0-{duration:.2f}")
+            break
+        if segment['start'] < previous - 0.05:
+            failures.append(f"{label}: segment at {segment['start']:.2f} goes back before {previous:.2f}")
+            break
+        previous = segment['start']
+    return failures
+
+def run_backend(asr, source, samples, duration):
+    # The same contract every backend has to meet, plus its load time and real-time factor on the sample
+    from src.processing.ai_processor import transcribe_stream, STREAM_WINDOW, STREAM_OVERLAP
+    from src.processing.audio_stream import iter_pcm_windows
+    failures = []
+    started = time.perf_counter()
+    model = asr.load()
+    load_s = time.perf_counter() - started
+    if asr.load() is not model:
+        failures.append(f"{asr.name}: load() does not reuse the cached model")
+
+    language, probability = asr.detect_language(samples[:30 * 16000].astype('float32') / 32768.0)
+    if not isinstance(language, str) or not 0 <= float(probability) <= 1:
+        failures.append(f"{asr.name}: detect_language returned ({language!r}, {probability!r})")
+
+    clip = samples[:STREAM_WINDOW * 16000].astype('float32') / 32768.0
+    failures += check_segments(asr.transcribe(clip), len(clip) / 16000, f"{asr.name} samples")
+    failures += check_segments(asr.transcribe(clip, language=language, prompt="Hello."), len(clip) / 16000,
+                               f"{asr.name} language+prompt")
+    failures += check_segments(asr.transcribe(source), duration, f"{asr.name} path")
+    failures += check_segments(asr.transcribe(clip, words=True), len(clip) / 16000, f"{asr.name} words", words=True)
+
+    started = time.perf_counter()
+    streamed = list(transcribe_stream(asr, iter_pcm_windows(samples, STREAM_WINDOW, STREAM_OVERLAP), language=language))
+    transcribe_s = time.perf_counter() - started
+    failures += check_segments(streamed, duration, f"{asr.name} stream")
+    return {'load_s': load_s, 'transcribe_s': transcribe_s, 'rtf': transcribe_s / duration,
+            'segments': len(streamed), 'language': language}, failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the ASR backend conformance checks and compare their speed")
+    parser.add_argument('--backends', nargs='*', help="backends to check (default: all)")
+    parser.add_argument('--model', default='tiny', help="model size for --real-models")
+    parser.add_argument('--sample', help="audio or video file with speech (default: synthetic tone)")
+    parser.add_argument('--duration', type=int, default=90, help="synthetic sample length in seconds")
+    parser.add_argument('--real-models', action='store_true', help="load real models instead of the mocks")
+    args = parser.parse_args(argv)
+
+    from src.processing.asr import BACKENDS
+    from src.processing.audio_stream import decode_pcm, open_pcm
+    source = args.sample or generate_audio(WORK_DIR, args.duration)
+    samples = open_pcm(decode_pcm(source, os.path.join(WORK_DIR, 'asr-sample.pcm')))
+    duration = len(samples) / 16000
+
+    failures = []
+    with (contextlib.nullcontext() if args.real_models else mock_models()):
+        for name in args.backends or list(BACKENDS):
+            asr = BACKENDS[name](args.model if args.real_models else None)
+            try:
+                result, problems = run_backend(asr, source, samples, duration)
+            except ImportError as e:
+                print(f"{name:15} skipped ({e})")
+                continue
+            failures += problems
+            print(f"{name:15} load {result['load_s']:6.2f}s  transcribe {result['transcribe_s']:6.2f}s  "
+                  f"RTF {result['rtf']:.3f}  {result['segments']} segments  language {result['language']}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
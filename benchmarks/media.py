@@ -0,0 +1,52 @@
+import os
+import subprocess
+from src.utils.subtitles import format_timestamp
+
+RESOLUTIONS = {'360p': '640x360', '720p': '1280x720', '1080p': '1920x1080'}
+
+def generate_media(work_dir, duration, resolution, audio='sine'):
+    os.makedirs(work_dir, exist_ok=True)
+    size = RESOLUTIONS.get(resolution, resolution)
+    output_path = os.path.join(work_dir, f"src-{resolution}-{duration}s-{audio}.mp4")
+    if os.path.exists(output_path):
+        return output_path
+    if audio == 'silence':
+        audio_src = f"anullsrc=channel_layout=stereo:sample_rate=44100:duration={duration}"
+    else:
+        audio_src = f"sine=frequency=440:sample_rate=44100:duration={duration}"
+    # bitexact flags keep the generated files byte-identical between runs
+    cmd = [
+        'ffmpeg', '-hide_banner', '-loglevel', 'error',
+        '-f', 'lavfi', '-i', f"testsrc2=size={size}:rate=30:duration={duration}",
+        '-f', 'lavfi', '-i', audio_src,
+        '-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p', '-threads', '1',
+        '-c:a', 'aac', '-shortest', '-map_metadata', '-1',
+        '-fflags', '+bitexact', '-flags:v', '+bitexact', '-flags:a', '+bitexact',
+        '-y', output_path
+    ]
+    subprocess.run(cmd, check=True)
+    return output_path
+
+def generate_audio(work_dir, duration, audio='sine'):
+    os.makedirs(work_dir, exist_ok=True)
+    output_path = os.path.join(work_dir, f"audio-{duration}s-{audio}.m4a")
+    if os.path.exists(output_path):
+        return output_path
+    if audio == 'silence':
+        audio_src = f"anullsrc=channel_layout=mono:sample_rate=16000:duration={duration}"
+    else:
+        audio_src = f"sine=frequency=440:sample_rate=16000:duration={duration}"
+    cmd = [
+        'ffmpeg', '-hide_banner', '-loglevel', 'error', '-f', 'lavfi', '-i', audio_src,
+        '-c:a', 'aac', '-b:a', '32k', '-map_metadata', '-1', '-fflags', '+bitexact', '-flags:a', '+bitexact',
+        '-y', output_path
+    ]
+    subprocess.run(cmd, check=True)
+    return output_path
+
+def synthetic_subtitles(duration, step=2):
+    subtitles = []
+    for i, start in enumerate(range(0, int(duration), step), 1):
+        end = min(start + step, duration)
+        subtitles.append((format_timestamp(start), format_timestamp(end), f"Benchmark caption {i}"))
+    return subtitles
@@ -0,0 +1,74 @@
+import contextlib
+import subprocess
+import sys
+import types
+from src.utils.media_probe import parse_duration
+
+def _audio_duration(audio_path):
+    # ffmpeg's banner carries the duration, so the mocks work where ffprobe is not installed
+    stderr = subprocess.run(['ffmpeg', '-hide_banner', '-i', audio_path], capture_output=True, text=True).stderr
+    return next((d for d in map(parse_duration, stderr.splitlines()) if d is not None), 0.0)
+
+def _mock_segments(audio):
+    duration = _audio_duration(audio) if isinstance(audio, str) else len(audio) / 16000
+    segments = []
+    start = 0.0
+    while start < duration:
+        end = min(start + 2.0, duration)
+        words = [' mock', ' segment', f" {len(segments) + 1}."]
+        step = (end - start) / len(words)
+        segments.append({'start': start, 'end': end, 'text': ''.join(words),
+                         'words': [{'start': start + i * step, 'end': start + (i + 1) * step, 'word': word}
+                                   for i, word in enumerate(words)]})
+        start = end
+    return segments
+
+class MockWhisperModel:
+    # Reports itself as English-only so language detection short-circuits to 'en'
+    is_multilingual = False
+
+    def transcribe(self, audio, word_timestamps=False, **kwargs):
+        segments = _mock_segments(audio)
+        if not word_timestamps:
+            for segment in segments:
+                del segment['words']
+        return {'segments': segments, 'language': 'en'}
+
+class MockFasterWhisperModel:
+    # Same shape as faster_whisper.WhisperModel: a lazy segment generator plus an info object
+    def __init__(self, name, **kwargs):
+        self.name = name
+
+    def transcribe(self, audio, language=None, word_timestamps=False, **kwargs):
+        info = types.SimpleNamespace(language=language or 'en', language_probability=1.0)
+        segments = (types.SimpleNamespace(**{**segment, 'words': [types.SimpleNamespace(**word) for word in segment['words']]
+                                             if word_timestamps else None}) for segment in _mock_segments(audio))
+        return segments, info
+
+class MockWhisper:
+    def load_model(self, name, **kwargs):
+        return MockWhisperModel()
+
+def mock_pipeline(task, model=None, **kwargs):
+    def translate(text, **kw):
+        return [{'translation_text': text[::-1]}]
+    return translate
+
+@contextlib.contextmanager
+def mock_models():
+    from src.processing import models
+    saved = models.whisper, models.pipeline
+    saved_faster = sys.modules.get('faster_whisper')
+    models.whisper, models.pipeline = MockWhisper(), mock_pipeline
+    sys.modules['faster_whisper'] = types.ModuleType('faster_whisper')
+    sys.modules['faster_whisper'].WhisperModel = MockFasterWhisperModel
+    models.clear_cache()
+    try:
+        yield
+    finally:
+        models.whisper, models.pipeline = saved
+        if saved_faster is None:
+            sys.modules.pop('faster_whisper', None)
+        else:
+            sys.modules['faster_whisper'] = saved_faster
+        models.clear_cache()
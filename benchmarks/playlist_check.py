@@ -0,0 +1,144 @@
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.utils.youtube_downloader import FORMAT, YtDlpExtractor
+
+WORK_DIR = os.path.join('temp', 'bench', 'playlist')
+VIDEO_SIZE = 256 * 1024
+
+def payload(video_id):
+    return hashlib.sha256(video_id.encode()).digest() * (VIDEO_SIZE // 32)
+
+class StandIn(BaseHTTPRequestHandler):
+    # Local replacement for the video CDN: honours Range, drops 'flaky' videos halfway on the first try
+    # and always fails 'broken' ones
+    requests = []
+    dropped = set()
+    lock = threading.Lock()
+
+    def do_GET(self):
+        video_id = self.path.strip('/')
+        offset = int(self.headers.get('Range', 'bytes=0-')[6:].split('-')[0] or 0)
+        with self.lock:
+            self.requests.append((video_id, offset))
+        if video_id.startswith('broken'):
+            self.send_error(503)
+            return
+        data = payload(video_id)[offset:]
+        self.send_response(206 if offset else 200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(len(data)))
+        if offset:
+            self.send_header('Content-Range', f"bytes {offset}-{VIDEO_SIZE - 1}/{VIDEO_SIZE}")
+        self.end_headers()
+        time.sleep(0.05)
+        with self.lock:
+            drop = video_id.startswith('flaky') and video_id not in self.dropped
+            self.dropped.add(video_id)
+        if drop:
+            self.wfile.write(data[:len(data) // 2])
+            self.wfile.flush()
+            self.connection.close()
+            return
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+class FakeExtractor(YtDlpExtractor):
+    # Playlist pages are faked; each video resolves to a direct format on the stand-in server, so
+    # download() runs yt-dlp's real HTTP downloader with continuedl and its .part file
+    def __init__(self, base_url, video_ids):
+        super().__init__()
+        self.base_url = base_url
+        self.video_ids = video_ids
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def extract(self, url, flat=False):
+        if url == 'fake://channel':
+            half = len(self.video_ids) // 2
+            return {'_type': 'playlist', 'entries': [
+                {'_type': 'url', 'ie_key': 'YoutubeTab', 'url': 'fake://channel/videos'},
+                {'_type': 'playlist', 'entries': [{'id': v, 'url': f"fake://{v}"} for v in self.video_ids[half:]]},
+                {'id': self.video_ids[0], 'url': f"fake://{self.video_ids[0]}"},
+            ]}
+        if url == 'fake://channel/videos':
+            half = len(self.video_ids) // 2
+            return {'_type': 'playlist', 'entries': [{'id': v, 'url': f"fake://{v}"} for v in self.video_ids[:half]]}
+        video_id = url[len('fake://'):]
+        return {'id': video_id, 'title': video_id, 'extractor': 'generic', 'extractor_key': 'Generic',
+                'webpage_url': url, 'formats': [{'format_id': FORMAT, 'url': f"{self.base_url}/{video_id}",
+                                                 'ext': 'mp4', 'protocol': 'http'}]}
+
+    def download(self, info, path):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            super().download(info, path)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check playlist expansion, concurrent downloads, retries and resume offline")
+    parser.add_argument('--videos', type=int, default=12)
+    parser.add_argument('--workers', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    from src.utils import youtube_downloader
+    from src.utils.artifact_store import ArtifactStore
+
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    video_ids = [f"video{i:02d}" for i in range(args.videos - 2)] + ['flaky01', 'broken01']
+    source = FakeExtractor(f"http://127.0.0.1:{server.server_address[1]}", video_ids)
+    saved_store = youtube_downloader.store
+    youtube_downloader.store = ArtifactStore(WORK_DIR, quota_mb=1024)
+    failures = []
+    try:
+        urls = youtube_downloader.expand_urls('fake://channel', source)
+        if sorted(urls) != sorted(f"fake://{v}" for v in video_ids):
+            failures.append(f"expansion returned {len(urls)} URLs for {len(video_ids)} videos")
+
+        results = {}
+        started = time.perf_counter()
+        paths = youtube_downloader.download_many(urls, lambda url, path, error: results.setdefault(url, error),
+                                                 workers=args.workers, retries=2, backoff=0.05, source=source)
+        elapsed = time.perf_counter() - started
+        for url, path in zip(urls, paths):
+            video_id = url[len('fake://'):]
+            if video_id.startswith('broken'):
+                if path or not results.get(url):
+                    failures.append(f"{video_id} should have failed after retries")
+                continue
+            if not path or open(path, 'rb').read() != payload(video_id):
+                failures.append(f"{video_id} is missing or corrupt ({results.get(url)})")
+        resumed = [offset for video_id, offset in StandIn.requests if video_id == 'flaky01' and offset]
+        if not resumed:
+            failures.append("flaky download restarted from zero instead of resuming")
+        broken_attempts = sum(1 for video_id, _ in StandIn.requests if video_id == 'broken01')
+        if broken_attempts != 3:
+            failures.append(f"broken video was tried {broken_attempts} times, expected 3")
+        if not 1 < source.peak <= args.workers:
+            failures.append(f"peak parallel downloads {source.peak}, expected 2..{args.workers}")
+        print(f"{len(urls)} videos in {elapsed:.2f}s, peak parallelism {source.peak}, "
+              f"flaky video resumed at byte {resumed[0] if resumed else 0}")
+    finally:
+        youtube_downloader.store = saved_store
+        server.shutdown()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
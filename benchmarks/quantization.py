@@ -0,0 +1,138 @@
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from collections import Counter
+
+SENTENCES = [
+    "Welcome back to the channel, today we are cutting a long video into shorts.",
+    "The weather was great, so we decided to film everything outside.",
+    "Please like and subscribe if you want to see more videos like this one.",
+    "This camera records in four K at sixty frames per second.",
+    "Let me know in the comments what you would like to see next time.",
+    "We spent three hours editing this clip, and it was worth it.",
+    "The most important part of a short video is the first three seconds.",
+    "Thank you so much for watching, see you in the next episode.",
+]
+
+def peak_rss_mb():
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / (1024 * 1024)
+
+def word_error_rate(reference, hypothesis):
+    ref, hyp = reference.lower().split(), hypothesis.lower().split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word))
+        previous = current
+    return previous[-1] / len(ref)
+
+def bleu(references, hypotheses, max_n=4):
+    matches, totals = [0] * max_n, [0] * max_n
+    ref_length = hyp_length = 0
+    for reference, hypothesis in zip(references, hypotheses):
+        ref, hyp = reference.split(), hypothesis.split()
+        ref_length += len(ref)
+        hyp_length += len(hyp)
+        for n in range(1, max_n + 1):
+            ref_ngrams = Counter(tuple(ref[i:i + n]) for i in range(len(ref) - n + 1))
+            hyp_ngrams = Counter(tuple(hyp[i:i + n]) for i in range(len(hyp) - n + 1))
+            matches[n - 1] += sum((hyp_ngrams & ref_ngrams).values())
+            totals[n - 1] += max(len(hyp) - n + 1, 0)
+    if not hyp_length:
+        return 0.0
+    # add-one smoothing keeps short samples from collapsing to zero
+    log_precision = sum(math.log((m + 1) / (t + 1)) for m, t in zip(matches, totals)) / max_n
+    brevity = 1.0 if hyp_length > ref_length else math.exp(1 - ref_length / hyp_length)
+    return 100 * brevity * math.exp(log_precision)
+
+def int8_layers(model):
+    return sum(1 for module in model.modules() if type(module).__module__.startswith('torch.ao.nn.quantized'))
+
+def run_variant(sample, target_lang, quantize, queue):
+    from src.processing import models
+    result = {'quantized': quantize}
+    started = time.perf_counter()
+    model = models.load_whisper_model(quantize=quantize)
+    result['whisper_load_s'] = time.perf_counter() - started
+    result['whisper_int8_layers'] = int8_layers(model)
+    started = time.perf_counter()
+    output = model.transcribe(sample, **models.transcribe_options(quantize))
+    result['transcribe_s'] = time.perf_counter() - started
+    result['transcript'] = output['text'].strip()
+
+    model_name = f"Helsinki-NLP/opus-mt-en-{target_lang}"
+    started = time.perf_counter()
+    translator = models.load_translator(model_name, quantize=quantize)
+    result['translator_load_s'] = time.perf_counter() - started
+    result['translator_int8_layers'] = int8_layers(translator.model)
+    started = time.perf_counter()
+    result['translations'] = [translator(text)[0]['translation_text'] for text in SENTENCES]
+    result['translate_s'] = time.perf_counter() - started
+    result['peak_rss_mb'] = peak_rss_mb()
+    queue.put(result)
+
+def measure(sample, target_lang, quantize):
+    # A fresh interpreter per variant keeps the peak RSS of one model from hiding the other
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=run_variant, args=(sample, target_lang, quantize, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare fp32 and int8-quantized Whisper/MarianMT on CPU")
+    parser.add_argument('--sample', required=True, help="audio or video file with speech")
+    parser.add_argument('--reference', help="text file with the reference transcript (defaults to fp32 output)")
+    parser.add_argument('--target-lang', default='vi')
+    parser.add_argument('--output', default=os.path.join('temp', 'bench', 'quantization.json'))
+    args = parser.parse_args(argv)
+
+    fp32 = measure(args.sample, args.target_lang, False)
+    # Second run loads the int8 state_dict written by the first
+    measure(args.sample, args.target_lang, True)
+    int8 = measure(args.sample, args.target_lang, True)
+    if not int8['whisper_int8_layers'] or not int8['translator_int8_layers']:
+        print(f"FAIL: int8 run has {int8['whisper_int8_layers']} Whisper and "
+              f"{int8['translator_int8_layers']} MarianMT quantized layers")
+        return 1
+
+    reference = fp32['transcript']
+    if args.reference:
+        with open(args.reference, 'r', encoding='utf-8') as f:
+            reference = f.read()
+    report = {
+        'fp32': fp32,
+        'int8': int8,
+        'transcribe_speedup': fp32['transcribe_s'] / int8['transcribe_s'],
+        'translate_speedup': fp32['translate_s'] / int8['translate_s'],
+        'memory_saving_mb': fp32['peak_rss_mb'] - int8['peak_rss_mb'],
+        'wer_fp32': word_error_rate(reference, fp32['transcript']),
+        'wer_int8': word_error_rate(reference, int8['transcript']),
+        'bleu_int8_vs_fp32': bleu(fp32['translations'], int8['translations']),
+    }
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"transcribe: {fp32['transcribe_s']:.2f}s -> {int8['transcribe_s']:.2f}s ({report['transcribe_speedup']:.2f}x)")
+    print(f"translate:  {fp32['translate_s']:.2f}s -> {int8['translate_s']:.2f}s ({report['translate_speedup']:.2f}x)")
+    print(f"int8 layers: Whisper {int8['whisper_int8_layers']}, MarianMT {int8['translator_int8_layers']}")
+    print(f"peak RSS:   {fp32['peak_rss_mb']:.0f} MB -> {int8['peak_rss_mb']:.0f} MB")
+    print(f"WER:        fp32 {report['wer_fp32']:.3f}, int8 {report['wer_int8']:.3f}")
+    print(f"BLEU int8 vs fp32: {report['bleu_int8_vs_fp32']:.1f}")
+    print(f"Report written to {args.output}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
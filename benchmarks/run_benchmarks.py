@@ -0,0 +1,127 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from PyQt6.QtCore import QCoreApplication
+from benchmarks.media import generate_media, synthetic_subtitles
+from benchmarks.mocks import mock_models
+
+WORK_DIR = os.path.join('temp', 'bench')
+DEFAULT_BASELINE = os.path.join('benchmarks', 'baseline.json')
+DEFAULT_DURATIONS = [10, 60]
+DEFAULT_RESOLUTIONS = ['360p', '720p', '1080p']
+DEFAULT_THRESHOLD = 0.15
+
+def run_thread(thread):
+    errors = []
+    thread.error.connect(errors.append)
+    thread.run()
+    if errors:
+        raise RuntimeError(errors[0])
+
+def time_stage(func, repeat):
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    return {'median': statistics.median(runs), 'min': min(runs), 'runs': runs}
+
+def bench_case(source, duration, repeat):
+    from src.processing import ai_processor
+    from src.processing.process_thread import ProcessThread
+    from src.processing.export_thread import ExportThread
+
+    audio_path = os.path.join(WORK_DIR, 'audio.mp3')
+    processed_path = os.path.join(WORK_DIR, 'processed.mp4')
+    exported_path = os.path.join(WORK_DIR, 'exported.mp4')
+    subtitles = synthetic_subtitles(duration)
+
+    results = {}
+    results['extract_audio'] = time_stage(lambda: ai_processor.extract_audio(source, audio_path), repeat)
+    results['transcribe'] = time_stage(lambda: ai_processor.transcribe_audio(audio_path), repeat)
+    results['translate'] = time_stage(lambda: ai_processor.translate_subtitles(subtitles, 'Vietnamese'), repeat)
+    results['process'] = time_stage(lambda: run_thread(ProcessThread(
+        source, processed_path, '9:16', 'Arial', '#ffffff', subtitles, 'English', 'Auto')), repeat)
+    results['export'] = time_stage(lambda: run_thread(ExportThread(processed_path, exported_path, '720p')), repeat)
+    results['export_multi'] = time_stage(lambda: run_thread(ExportThread(
+        processed_path, os.path.join(WORK_DIR, 'exported-{resolution}.mp4'), ['720p', '1080p'])), repeat)
+    return results
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for key, entry in results.items():
+        reference = baseline.get('results', {}).get(key)
+        if not reference or reference['median'] <= 0:
+            continue
+        ratio = entry['median'] / reference['median']
+        entry['baseline_ratio'] = round(ratio, 3)
+        if ratio > 1 + threshold:
+            regressions.append((key, reference['median'], entry['median'], ratio))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stage-level benchmarks on synthetic media")
+    parser.add_argument('--durations', type=int, nargs='+', default=DEFAULT_DURATIONS)
+    parser.add_argument('--resolutions', nargs='+', default=DEFAULT_RESOLUTIONS)
+    parser.add_argument('--audio', choices=['sine', 'silence'], default='sine')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--mock-models', action='store_true', help="replace Whisper/MarianMT with instant mocks")
+    parser.add_argument('--output', default=os.path.join(WORK_DIR, 'results.json'))
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    os.makedirs('temp', exist_ok=True)
+    os.makedirs(WORK_DIR, exist_ok=True)
+
+    results = {}
+    models = mock_models() if args.mock_models else contextlib.nullcontext()
+    with models:
+        for resolution in args.resolutions:
+            for duration in args.durations:
+                source = generate_media(WORK_DIR, duration, resolution, args.audio)
+                case = f"{resolution}-{duration}s"
+                print(f"Benchmarking {case}...")
+                for stage, entry in bench_case(source, duration, args.repeat).items():
+                    results[f"{case}/{stage}"] = entry
+                    print(f"  {stage:<14} {entry['median']:.3f}s")
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'mock_models': args.mock_models,
+            'repeat': args.repeat,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    for key, before, after, ratio in regressions:
+        print(f"REGRESSION {key}: {before:.3f}s -> {after:.3f}s ({(ratio - 1) * 100:+.1f}%)")
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,44 @@
+import argparse
+import contextlib
+import os
+import resource
+import sys
+import time
+from benchmarks.media import generate_audio
+from benchmarks.mocks import mock_models
+
+WORK_DIR = os.path.join('temp', 'bench')
+
+def rss_mb():
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / (1024 * 1024)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the peak-memory ceiling of streaming transcription")
+    parser.add_argument('--duration', type=int, default=3 * 3600, help="synthetic input length in seconds")
+    parser.add_argument('--ceiling-mb', type=float, default=64, help="allowed peak RSS growth during transcription")
+    parser.add_argument('--real-models', action='store_true', help="use Whisper instead of the mock model")
+    parser.add_argument('--backend', help="ASR backend (default: APPCUTSHORT_ASR)")
+    args = parser.parse_args(argv)
+
+    from src.processing import ai_processor
+    from src.processing.asr import get_backend
+    source = generate_audio(WORK_DIR, args.duration)
+    with (contextlib.nullcontext() if args.real_models else mock_models()):
+        # Load the model up front so only the streaming loop is measured
+        get_backend(args.backend).load()
+        before = rss_mb()
+        started = time.perf_counter()
+        count = sum(1 for _ in ai_processor.stream_subtitles(source, backend=args.backend))
+        elapsed = time.perf_counter() - started
+        growth = rss_mb() - before
+
+    print(f"{args.duration}s input, {count} segments in {elapsed:.1f}s, peak RSS growth {growth:.1f} MB "
+          f"(ceiling {args.ceiling_mb:.0f} MB)")
+    if growth > args.ceiling_mb:
+        print("FAIL: streaming transcription exceeded the memory ceiling")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import argparse
+import json
+import os
+import sys
+from src.daemon.client import DaemonClient
+
+def cmd_serve(args):
+    from src.daemon.server import serve
+    if args.profiling:
+        from src.utils import profiling
+        profiling.enable()
+    serve(args.address, args.workers, args.preload)
+    return 0
+
+def cmd_submit(args):
+    client = DaemonClient(args.address)
+    source = args.source if args.source.startswith(('http://', 'https://')) else os.path.abspath(args.source)
+    spec = {
+        'ratio': args.ratio,
+        'language': args.language,
+        'duration': args.duration,
+        'start': args.start,
+        'jump_cut': args.jump_cut,
+        'profiling': args.profiling,
+        'asr_backend': args.asr,
+        'font': args.font,
+        'color': args.color,
+        'clips': args.clips,
+        'export': args.export,
+        'profile': args.profile,
+    }
+    if source.startswith(('http://', 'https://')):
+        from src.utils.youtube_downloader import expand_urls
+        urls = expand_urls(source)
+        if len(urls) > 1:
+            return submit_batch(client, urls, spec, args)
+    job = client.submit({**spec, 'source': source})
+    print(f"Submitted job {job['id']}")
+    if args.no_wait:
+        return 0
+    return follow_job(client, job)
+
+def submit_batch(client, urls, spec, args):
+    from src.utils.youtube_downloader import download_many
+    jobs = []
+
+    def on_result(url, path, error):
+        # Each video is queued as soon as its own download finishes
+        if error:
+            print(f"Failed {url}: {error}")
+            return
+        job = client.submit({**spec, 'source': os.path.abspath(path)})
+        jobs.append(job)
+        print(f"Submitted job {job['id']} for {url}")
+
+    print(f"{len(urls)} videos, downloading with {args.download_workers} workers")
+    download_many(urls, on_result, workers=args.download_workers)
+    if args.no_wait:
+        return 0 if len(jobs) == len(urls) else 1
+    failed = sum(follow_job(client, job) for job in jobs)
+    return 0 if not failed and len(jobs) == len(urls) else 1
+
+def follow_job(client, job):
+    for event in client.events(job['id']):
+        if event['event'] == 'progress':
+            print(f"\r{event['stage']}: {event['value']}%", end='', flush=True)
+        elif event['event'] == 'stage':
+            print(f"\n{event['stage']}...", end='', flush=True)
+        elif event['event'] == 'output':
+            print(f"\n  -> {event['path']}", end='')
+        elif event['event'] == 'profile':
+            print(f"\n  profile: {event['path']}", end='')
+        elif event['event'] == 'error':
+            print(f"\nError: {event['message']}")
+            return 1
+        elif event['event'] == 'done':
+            print("\nDone")
+    return 0
+
+def cmd_stats(args):
+    print(json.dumps(DaemonClient(args.address).stats(), indent=2))
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='appcutshort')
+    parser.add_argument('--address', default=os.environ.get('APPCUTSHORT_DAEMON', '127.0.0.1:8765'),
+                        help="host:port or unix:/path/to.sock")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = sub.add_parser('serve', help="run the render daemon with models kept in memory")
+    serve_parser.add_argument('--workers', type=int, default=int(os.environ.get('APPCUTSHORT_DAEMON_WORKERS', 1)))
+    serve_parser.add_argument('--preload', nargs='*', default=[], help="languages whose translation models to load at startup")
+    serve_parser.add_argument('--profiling', action='store_true', help="profile every job (cProfile + ffmpeg -benchmark)")
+    serve_parser.set_defaults(func=cmd_serve)
+
+    submit_parser = sub.add_parser('submit', help="submit a job to the daemon")
+    submit_parser.add_argument('source', help="video path or YouTube video, playlist or channel URL")
+    submit_parser.add_argument('--ratio', default='9:16', choices=['9:16', '16:9', '1:1'])
+    submit_parser.add_argument('--language', default='English', choices=['English', 'Vietnamese', 'Japanese'])
+    submit_parser.add_argument('--duration', default='Auto', choices=['Auto', '<30s', '30s - 60s', '60s - 90s', '90s - 3min'])
+    submit_parser.add_argument('--start', default='0', help="window start (e.g. 01:30) or 'auto' for the liveliest part")
+    submit_parser.add_argument('--jump-cut', action='store_true', help="remove silent pauses")
+    submit_parser.add_argument('--font', default='Arial')
+    submit_parser.add_argument('--color', default='#ffffff')
+    submit_parser.add_argument('--clips', default='', help="e.g. 00:30-01:30, 05:00-06:00")
+    submit_parser.add_argument('--export', nargs='*', default=[], choices=['720p', '1080p', '2K', '4K'])
+    submit_parser.add_argument('--profile', default='Default')
+    submit_parser.add_argument('--download-workers', type=int, default=int(os.environ.get('APPCUTSHORT_DOWNLOAD_WORKERS', 4)))
+    submit_parser.add_argument('--asr', choices=['whisper', 'faster-whisper'], help="ASR engine (default: the daemon's)")
+    submit_parser.add_argument('--profiling', action='store_true', help="profile this job (cProfile + ffmpeg -benchmark)")
+    submit_parser.add_argument('--no-wait', action='store_true')
+    submit_parser.set_defaults(func=cmd_submit)
+
+    stats_parser = sub.add_parser('stats', help="show queue depth and throughput")
+    stats_parser.set_defaults(func=cmd_stats)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,2 @@
+from .server import RenderDaemon, serve
+from .client import DaemonClient
\ No newline at end of file
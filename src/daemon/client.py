@@ -0,0 +1,73 @@
+import http.client
+import json
+import os
+import socket
+
+# The GUI probes the daemon from DaemonJobThread before submitting, so a stalled daemon must fail fast
+AVAILABILITY_TIMEOUT = 1.0
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=None):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+class DaemonClient:
+    def __init__(self, address=None, timeout=None):
+        self.address = address or os.environ.get('APPCUTSHORT_DAEMON', '127.0.0.1:8765')
+        self.timeout = timeout
+
+    def connection(self, timeout=None):
+        timeout = timeout or self.timeout
+        if self.address.startswith('unix:'):
+            return _UnixHTTPConnection(self.address[len('unix:'):], timeout)
+        host, _, port = self.address.rpartition(':')
+        return http.client.HTTPConnection(host or '127.0.0.1', int(port), timeout=timeout)
+
+    def request(self, method, path, payload=None, timeout=None):
+        conn = self.connection(timeout)
+        try:
+            body = json.dumps(payload).encode('utf-8') if payload is not None else None
+            conn.request(method, path, body=body, headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            data = response.read()
+        finally:
+            conn.close()
+        if response.getheader('Content-Type', '').startswith('application/json'):
+            data = json.loads(data or b'null')
+        if response.status >= 400:
+            raise RuntimeError(data.get('error') if isinstance(data, dict) else data)
+        return data
+
+    def is_available(self):
+        try:
+            self.request('GET', '/stats', timeout=AVAILABILITY_TIMEOUT)
+            return True
+        except (OSError, RuntimeError, ValueError):
+            return False
+
+    def submit(self, spec):
+        return self.request('POST', '/jobs', spec)
+
+    def job(self, job_id):
+        return self.request('GET', f"/jobs/{job_id}")
+
+    def stats(self):
+        return self.request('GET', '/stats')
+
+    def events(self, job_id):
+        conn = self.connection()
+        try:
+            conn.request('GET', f"/jobs/{job_id}/events")
+            response = conn.getresponse()
+            if response.status >= 400:
+                raise RuntimeError(json.loads(response.read() or b'{}').get('error', 'Unknown job'))
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            conn.close()
@@ -0,0 +1,232 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from src.utils import metrics
+
+DEFAULT_ADDRESS = os.environ.get('APPCUTSHORT_DAEMON', '127.0.0.1:8765')
+WORKERS = int(os.environ.get('APPCUTSHORT_DAEMON_WORKERS', 1))
+THROUGHPUT_WINDOW = 3600
+# Finished jobs and their event logs stay around for late followers, then are dropped
+FINISHED_JOBS_KEPT = 100
+FINISHED_JOB_TTL = 3600
+
+STATUS_TEXT = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+class DaemonJob:
+    def __init__(self, spec):
+        self.id = uuid.uuid4().hex[:12]
+        self.spec = spec
+        self.status = 'queued'
+        self.events = []
+        self.outputs = []
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.changed = asyncio.Event()
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'spec': self.spec,
+            'outputs': self.outputs,
+            'error': self.error,
+            'submitted': self.submitted,
+            'started': self.started,
+            'finished': self.finished,
+        }
+
+class RenderDaemon:
+    def __init__(self, workers=WORKERS, preload_languages=None):
+        self.workers = workers
+        self.preload_languages = preload_languages or []
+        self.jobs = {}
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='render')
+        self.completed = deque()
+        self.failed = 0
+        self.running = 0
+        self.started = time.time()
+        self.loop = None
+
+    def warm_models(self):
+        # Loaded once here and reused by every job through the cache in models.py
+        from src.processing.models import load_translator
+        from src.processing.ai_processor import translation_models
+        from src.processing.asr import get_backend
+        get_backend().load()
+        for language in self.preload_languages:
+            for model_name in translation_models(language):
+                load_translator(model_name)
+
+    def prune(self):
+        now = time.time()
+        finished = sorted((job for job in self.jobs.values() if job.finished), key=lambda job: job.finished)
+        for i, job in enumerate(finished):
+            if len(finished) - i > FINISHED_JOBS_KEPT or now - job.finished > FINISHED_JOB_TTL:
+                del self.jobs[job.id]
+
+    def submit(self, spec):
+        from src.processing.jobs import normalize_spec
+        normalize_spec(dict(spec))
+        self.prune()
+        job = DaemonJob(spec)
+        self.jobs[job.id] = job
+        self.publish(job, {'event': 'queued', 'position': self.queue.qsize() + 1})
+        self.queue.put_nowait(job)
+        return job
+
+    def publish(self, job, event):
+        event = {'job': job.id, 'time': time.time(), **event}
+        job.events.append(event)
+        job.changed.set()
+        job.changed = asyncio.Event()
+
+    def publish_threadsafe(self, job, event):
+        self.loop.call_soon_threadsafe(self.publish, job, event)
+
+    async def worker(self):
+        from src.processing.jobs import run_job
+        while True:
+            job = await self.queue.get()
+            job.status = 'running'
+            job.started = time.time()
+            self.running += 1
+            self.publish(job, {'event': 'started'})
+            try:
+                job.outputs = await self.loop.run_in_executor(
+                    self.executor, run_job, job.id, job.spec, lambda event: self.publish_threadsafe(job, event))
+                job.status = 'done'
+                self.completed.append((time.time(), time.time() - job.started))
+                self.publish(job, {'event': 'done', 'outputs': job.outputs})
+            except Exception as e:
+                job.status = 'error'
+                job.error = str(e)
+                self.failed += 1
+                self.publish(job, {'event': 'error', 'message': str(e)})
+            finally:
+                job.finished = time.time()
+                self.running -= 1
+                self.queue.task_done()
+                self.prune()
+
+    def stats(self):
+        now = time.time()
+        while self.completed and now - self.completed[0][0] > THROUGHPUT_WINDOW:
+            self.completed.popleft()
+        durations = [duration for _, duration in self.completed]
+        window = min(THROUGHPUT_WINDOW, now - self.started) or 1
+        return {
+            'queue_depth': self.queue.qsize(),
+            'running': self.running,
+            'workers': self.workers,
+            'completed_last_hour': len(durations),
+            'failed': self.failed,
+            'jobs_per_hour': round(len(durations) * 3600 / window, 2),
+            'avg_job_seconds': round(sum(durations) / len(durations), 2) if durations else None,
+            'uptime_seconds': round(now - self.started, 1),
+        }
+
+    async def stream_events(self, job, writer):
+        sent = 0
+        while True:
+            changed = job.changed
+            while sent < len(job.events):
+                writer.write((json.dumps(job.events[sent], ensure_ascii=False) + '\n').encode('utf-8'))
+                sent += 1
+            await writer.drain()
+            if job.status in ('done', 'error') and sent >= len(job.events):
+                return
+            await changed.wait()
+
+    async def handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+            method, path, _ = request_line.decode('latin-1').split(' ', 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get('content-length', 0) or 0))
+            await self.route(method, path.split('?', 1)[0].rstrip('/'), body, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def respond(self, writer, status, payload, content_type='application/json'):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        writer.write(f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\nContent-Type: {content_type}\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1') + body)
+
+    async def route(self, method, path, body, writer):
+        parts = path.strip('/').split('/')
+        if path == '/jobs' and method == 'POST':
+            try:
+                spec = json.loads(body or b'{}')
+            except ValueError as e:
+                self.respond(writer, 400, {'error': f"Invalid JSON body: {e}"})
+                return
+            if not isinstance(spec, dict):
+                self.respond(writer, 400, {'error': "Job spec must be a JSON object"})
+                return
+            try:
+                job = self.submit(spec)
+            except ValueError as e:
+                self.respond(writer, 400, {'error': str(e)})
+                return
+            self.respond(writer, 202, job.to_dict())
+        elif path == '/jobs' and method == 'GET':
+            self.respond(writer, 200, [job.to_dict() for job in self.jobs.values()])
+        elif parts[0] == 'jobs' and len(parts) in (2, 3):
+            job = self.jobs.get(parts[1])
+            if not job:
+                self.respond(writer, 404, {'error': f"Unknown job: {parts[1]}"})
+            elif len(parts) == 2:
+                self.respond(writer, 200, job.to_dict())
+            elif parts[2] == 'events':
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nConnection: close\r\n\r\n")
+                await self.stream_events(job, writer)
+            else:
+                self.respond(writer, 404, {'error': 'Not found'})
+        elif path == '/stats':
+            self.respond(writer, 200, self.stats())
+        elif path == '/metrics':
+            self.respond(writer, 200, metrics.render_prometheus().encode('utf-8'), 'text/plain; version=0.0.4')
+        else:
+            self.respond(writer, 404, {'error': 'Not found'})
+        await writer.drain()
+
+    async def serve(self, address=DEFAULT_ADDRESS):
+        self.loop = asyncio.get_running_loop()
+        print("Loading models...")
+        await self.loop.run_in_executor(self.executor, self.warm_models)
+        if address.startswith('unix:'):
+            server = await asyncio.start_unix_server(self.handle, path=address[len('unix:'):])
+        else:
+            host, _, port = address.rpartition(':')
+            server = await asyncio.start_server(self.handle, host or '127.0.0.1', int(port))
+        for _ in range(self.workers):
+            asyncio.create_task(self.worker())
+        print(f"AppCutShort daemon listening on {address}")
+        async with server:
+            await server.serve_forever()
+
+def serve(address=DEFAULT_ADDRESS, workers=WORKERS, preload_languages=None):
+    os.makedirs('temp', exist_ok=True)
+    os.makedirs('output', exist_ok=True)
+    daemon = RenderDaemon(workers, preload_languages)
+    try:
+        asyncio.run(daemon.serve(address))
+    except KeyboardInterrupt:
+        pass
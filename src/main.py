@@ -441,6 +441,7 @@ import sys
 import os
 from PyQt6.QtWidgets import QApplication
 from src.ui.main_window import VideoEditor
+from src.utils import metrics, profiling
 
 if not os.path.exists('temp'):
     os.makedirs('temp')
@@ -448,6 +449,11 @@ if not os.path.exists('output'):
     os.makedirs('output')
 
 if __name__ == '__main__':
+    if metrics.METRICS_PORT:
+        metrics.start_metrics_server()
+    if '--profiling' in sys.argv:
+        profiling.enable()
+        sys.argv.remove('--profiling')
     app = QApplication(sys.argv)
     window = VideoEditor()
     window.show()
@@ -1,35 +1,179 @@
 import os
 import subprocess
 import re
-import whisper
-from transformers import pipeline
+import tempfile
+from src.utils import metrics
+from src.utils.cpu_budget import rebalance, ml_stage, encode_stage, ffmpeg_global_args, ffmpeg_thread_args
+from src.processing.models import load_translator, inference_lock
+from src.processing.asr import get_backend
+from src.utils.subtitles import format_timestamp, parse_timestamp, slice_subtitles
+from src.utils.media_probe import try_probe
+from src.processing.audio_stream import SAMPLE_RATE, iter_pipe_windows, iter_pcm_windows, open_pcm
+
+# Inputs longer than STREAM_THRESHOLD seconds are transcribed window by window so memory stays flat
+STREAM_THRESHOLD = int(os.environ.get('APPCUTSHORT_STREAM_THRESHOLD', 600))
+STREAM_WINDOW = int(os.environ.get('APPCUTSHORT_STREAM_WINDOW', 30))
+STREAM_OVERLAP = 2
+DETECT_SECONDS = 30
+# Guesses below this (music or silent intros) are ignored: Whisper picks per window and translation assumes English
+MIN_LANGUAGE_PROBABILITY = 0.5
 
 def extract_audio(video_path, audio_path):
-    cmd = ['ffmpeg', '-i', video_path, '-vn', '-acodec', 'mp3', audio_path, '-y']
-    subprocess.run(cmd, check=True)
-
-def generate_subtitles(video_path, language):
-    audio_path = os.path.join('temp', 'audio.mp3')
-    extract_audio(video_path, audio_path)
-    model = whisper.load_model("base")
-    result = model.transcribe(audio_path)
-    subtitles = []
-    for segment in result["segments"]:
-        start = f"{int(segment['start']//3600):02d}:{int((segment['start']%3600)//60):02d}:{segment['start']%60:06.3f}".replace('.', ',')
-        end = f"{int(segment['end']//3600):02d}:{int((segment['end']%3600)//60):02d}:{segment['end']%60:06.3f}".replace('.', ',')
-        text = segment['text']
-        subtitles.append((start, end, text))
-    os.remove(audio_path)
-    return translate_subtitles(subtitles, language)
-
-def translate_subtitles(subtitles, target_language):
-    lang_map = {'English': 'en', 'Vietnamese': 'vi', 'Japanese': 'ja'}
-    target_lang = lang_map.get(target_language, 'en')
-    if target_lang != 'en':
-        translator = pipeline("translation", model=f"Helsinki-NLP/opus-mt-en-{target_lang}")
-        translated = []
+    with metrics.stage('extract_audio'), encode_stage() as threads:
+        cmd = ['ffmpeg', *ffmpeg_global_args(threads), '-i', video_path, '-vn', '-acodec', 'mp3',
+               *ffmpeg_thread_args(threads), audio_path, '-y']
+        subprocess.run(cmd, check=True)
+
+def segment_to_subtitle(segment):
+    return (format_timestamp(segment['start']), format_timestamp(segment['end']), segment['text'])
+
+def detect_source_language(video_path, pcm_path=None, backend=None):
+    if pcm_path:
+        samples = open_pcm(pcm_path)[:DETECT_SECONDS * SAMPLE_RATE].astype('float32') / 32768.0
+    else:
+        windows = iter_pipe_windows(video_path, DETECT_SECONDS, 0)
+        samples = next(windows, (0, [], True))[1]
+        windows.close()
+    if not len(samples):
+        return None
+    asr = get_backend(backend)
+    asr.load()
+    with metrics.stage('detect_language', backend=asr.name) as record, ml_stage():
+        language, probability = asr.detect_language(samples)
+        record['language'] = language
+        record['probability'] = round(float(probability), 3)
+        if probability < MIN_LANGUAGE_PROBABILITY:
+            record['warning'] = 'low confidence, ignored'
+            return None
+    return language
+
+def transcribe_audio(audio_path, language=None, backend=None):
+    asr = get_backend(backend)
+    asr.load()
+    with metrics.stage('transcribe', backend=asr.name) as record, ml_stage():
+        segments = asr.transcribe(audio_path, language=language)
+        record['segments'] = len(segments)
+    return [segment_to_subtitle(segment) for segment in segments]
+
+def transcribe_stream(asr, windows, overlap=STREAM_OVERLAP, language=None, words=False):
+    committed = 0.0
+    prompt = None
+    for offset, samples, last in windows:
+        if not len(samples):
+            continue
+        rebalance()
+        # A known language skips the backend's own detection pass on every window
+        segments = asr.transcribe(samples, language=language, prompt=prompt, words=words)
+        # Segments starting in the second half of the overlap belong to the next window
+        boundary = float('inf') if last else offset + len(samples) / SAMPLE_RATE - overlap / 2
+        for segment in segments:
+            start = offset + segment['start']
+            end = offset + segment['end']
+            if start < committed - 0.05 or start >= boundary:
+                continue
+            committed = max(committed, end)
+            prompt = segment['text']
+            result = {'start': start, 'end': end, 'text': segment['text']}
+            if words:
+                result['words'] = [{**word, 'start': offset + word['start'], 'end': offset + word['end']}
+                                   for word in segment['words']]
+            yield result
+        committed = max(committed, boundary)
+
+def stream_segments(video_path, start=None, duration=None, pcm_path=None, language=None, backend=None, words=False):
+    asr = get_backend(backend)
+    asr.load()
+    if pcm_path:
+        windows = iter_pcm_windows(open_pcm(pcm_path), STREAM_WINDOW, STREAM_OVERLAP)
+    else:
+        windows = iter_pipe_windows(video_path, STREAM_WINDOW, STREAM_OVERLAP, start, duration)
+    with metrics.stage('transcribe', mode='stream', window=STREAM_WINDOW, backend=asr.name) as record, ml_stage():
+        record['segments'] = 0
+        for segment in transcribe_stream(asr, windows, language=language, words=words):
+            record['segments'] += 1
+            yield segment
+
+def stream_subtitles(video_path, start=None, duration=None, pcm_path=None, language=None, backend=None):
+    for segment in stream_segments(video_path, start, duration, pcm_path, language, backend):
+        yield segment_to_subtitle(segment)
+
+def transcribe_video(video_path, language=None, backend=None):
+    info = try_probe(video_path)
+    if info and info.duration > STREAM_THRESHOLD:
+        return list(stream_subtitles(video_path, language=language, backend=backend))
+    os.makedirs('temp', exist_ok=True)
+    # Unique name so jobs running side by side in the daemon don't overwrite each other's audio
+    fd, audio_path = tempfile.mkstemp(prefix='audio-', suffix='.mp3', dir='temp')
+    os.close(fd)
+    try:
+        extract_audio(video_path, audio_path)
+        return transcribe_audio(audio_path, language, backend)
+    finally:
+        os.remove(audio_path)
+
+def generate_subtitles(video_path, language, backend=None):
+    source = detect_source_language(video_path, backend=backend)
+    subtitles = transcribe_video(video_path, source, backend)
+    return translate_subtitles(subtitles, language, source)
+
+def generate_clip_subtitles(video_path, language, ranges, backend=None):
+    source = detect_source_language(video_path, backend=backend)
+    transcript = transcribe_video(video_path, source, backend)
+    # Only segments that land in at least one clip are worth translating
+    needed = [(start, end, text) for start, end, text in transcript
+              if any(parse_timestamp(end) > a and parse_timestamp(start) < b for a, b in ranges)]
+    translated = translate_subtitles(needed, language, source)
+    return translated, [slice_subtitles(translated, a, b) for a, b in ranges]
+
+LANG_MAP = {'English': 'en', 'Vietnamese': 'vi', 'Japanese': 'ja'}
+PIVOT_LANGUAGE = 'en'
+
+# Direct MarianMT pairs keyed by Whisper language codes; anything else goes through PIVOT_LANGUAGE
+TRANSLATION_PAIRS = {
+    ('en', 'vi'): 'Helsinki-NLP/opus-mt-en-vi',
+    ('en', 'ja'): 'Helsinki-NLP/opus-mt-en-jap',
+    ('vi', 'en'): 'Helsinki-NLP/opus-mt-vi-en',
+    ('ja', 'en'): 'Helsinki-NLP/opus-mt-ja-en',
+    **{(source, 'en'): f"Helsinki-NLP/opus-mt-{source}-en"
+       for source in ('fr', 'de', 'es', 'it', 'ru', 'zh', 'ko', 'ar', 'hi', 'id', 'th', 'nl', 'pt')},
+}
+
+def translation_route(source_lang, target_lang):
+    source_lang = source_lang or PIVOT_LANGUAGE
+    if source_lang == target_lang:
+        return []
+    if (source_lang, target_lang) in TRANSLATION_PAIRS:
+        return [TRANSLATION_PAIRS[source_lang, target_lang]]
+    first = TRANSLATION_PAIRS.get((source_lang, PIVOT_LANGUAGE))
+    second = TRANSLATION_PAIRS.get((PIVOT_LANGUAGE, target_lang))
+    if first and second:
+        return [first, second]
+    raise ValueError(f"No translation model from '{source_lang}' to '{target_lang}'")
+
+def translation_models(target_language, source_lang=PIVOT_LANGUAGE):
+    return translation_route(source_lang, LANG_MAP.get(target_language, 'en'))
+
+def translate_stream(subtitles, target_language, source_lang=PIVOT_LANGUAGE):
+    try:
+        model_names = translation_models(target_language, source_lang)
+    except ValueError as e:
+        # No model for this pair: keep the captions untranslated rather than failing the job
+        with metrics.stage('translate', source=source_lang, hops=0) as record:
+            record['warning'] = str(e)
+        model_names = []
+    if not model_names:
+        yield from subtitles
+        return
+    translators = [load_translator(model_name) for model_name in model_names]
+    with metrics.stage('translate', source=source_lang, hops=len(translators)) as record, ml_stage():
+        record['segments'] = 0
         for start, end, text in subtitles:
-            translated_text = translator(text)[0]['translation_text']
-            translated.append((start, end, translated_text))
-        return translated
-    return subtitles
\ No newline at end of file
+            rebalance()
+            for translator in translators:
+                with inference_lock(translator):
+                    text = translator(text)[0]['translation_text']
+            record['segments'] += 1
+            yield (start, end, text)
+
+def translate_subtitles(subtitles, target_language, source_lang=PIVOT_LANGUAGE):
+    return list(translate_stream(subtitles, target_language, source_lang))
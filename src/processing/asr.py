@@ -0,0 +1,80 @@
+import os
+from src.processing import models
+from src.processing.models import inference_lock, transcribe_options
+
+# APPCUTSHORT_ASR is the engine for jobs that don't pick one; 'faster-whisper' runs CTranslate2 int8 on CPU
+ASR_BACKEND = os.environ.get('APPCUTSHORT_ASR', 'whisper')
+
+# A backend loads its model once (load), tells which language a float32 16 kHz clip is in (detect_language)
+# and turns a file path or such a clip into [{'start', 'end', 'text'}] with times relative to the audio (transcribe);
+# with words=True each segment also carries [{'start', 'end', 'word'}]. model_id names the weights for cache keys.
+
+class WhisperBackend:
+    name = 'whisper'
+
+    def __init__(self, model_name=None):
+        self.model_name = model_name
+
+    @property
+    def model_id(self):
+        return f"whisper-{self.model_name or models.WHISPER_MODEL}{'-int8' if models.QUANTIZE else ''}"
+
+    def load(self):
+        return models.load_whisper_model(self.model_name)
+
+    def detect_language(self, samples):
+        model = self.load()
+        with inference_lock(model):
+            return models.detect_language(model, samples)
+
+    def transcribe(self, audio, language=None, prompt=None, words=False):
+        model = self.load()
+        with inference_lock(model):
+            result = model.transcribe(audio, initial_prompt=prompt, language=language, word_timestamps=words,
+                                      **transcribe_options())
+        segments = []
+        for s in result['segments']:
+            segment = {'start': s['start'], 'end': s['end'], 'text': s['text']}
+            if words:
+                segment['words'] = [{'start': w['start'], 'end': w['end'], 'word': w['word']} for w in s.get('words', [])]
+            segments.append(segment)
+        return segments
+
+class FasterWhisperBackend:
+    name = 'faster-whisper'
+
+    def __init__(self, model_name=None, compute_type='int8'):
+        self.model_name = model_name
+        self.compute_type = compute_type
+
+    @property
+    def model_id(self):
+        return f"faster-whisper-{self.model_name or models.WHISPER_MODEL}-{self.compute_type}"
+
+    def load(self):
+        return models.load_faster_whisper_model(self.model_name, self.compute_type)
+
+    def detect_language(self, samples):
+        # transcribe() detects the language up front and decodes lazily; the segments are never consumed
+        _, info = self.load().transcribe(samples, beam_size=1)
+        return info.language, info.language_probability
+
+    def transcribe(self, audio, language=None, prompt=None, words=False):
+        # CTranslate2 queues concurrent calls itself, so no inference lock
+        segments, _ = self.load().transcribe(audio, language=language, initial_prompt=prompt, beam_size=5,
+                                             word_timestamps=words)
+        result = []
+        for s in segments:
+            segment = {'start': s.start, 'end': s.end, 'text': s.text}
+            if words:
+                segment['words'] = [{'start': w.start, 'end': w.end, 'word': w.word} for w in s.words or []]
+            result.append(segment)
+        return result
+
+BACKENDS = {backend.name: backend for backend in (WhisperBackend, FasterWhisperBackend)}
+
+def get_backend(name=None):
+    name = name or ASR_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown ASR backend: {name}")
+    return BACKENDS[name]()
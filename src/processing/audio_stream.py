@@ -0,0 +1,75 @@
+import subprocess
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+def pcm_command(video_path, output='-', start=None, duration=None, rate=SAMPLE_RATE):
+    # Audio decoding is effectively single threaded; keep it from claiming the encode budget
+    cmd = ['ffmpeg', '-nostdin', '-v', 'error', '-threads', '1']
+    if start:
+        cmd += ['-ss', f"{start:.3f}"]
+    if duration:
+        cmd += ['-t', f"{duration:.3f}"]
+    cmd += ['-i', video_path, '-vn', '-ac', '1', '-ar', str(rate), '-f', 's16le', '-y', output]
+    return cmd
+
+def decode_pcm(video_path, pcm_path, start=None, duration=None):
+    subprocess.run(pcm_command(video_path, pcm_path, start, duration), check=True)
+    return pcm_path
+
+def open_pcm(pcm_path):
+    return np.memmap(pcm_path, dtype=np.int16, mode='r')
+
+def _to_float(raw):
+    return np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+
+def _read_exact(stream, size):
+    chunks = []
+    while size > 0:
+        chunk = stream.read(size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size -= len(chunk)
+    data = b''.join(chunks)
+    # Keep whole samples only; a trailing odd byte can only come from a truncated stream
+    return data[:len(data) - len(data) % 2]
+
+def iter_pipe_windows(video_path, window, overlap, start=None, duration=None, rate=SAMPLE_RATE):
+    window_samples = int(window * rate)
+    overlap_samples = int(overlap * rate)
+    process = subprocess.Popen(pcm_command(video_path, '-', start, duration, rate),
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    finished = False
+    try:
+        offset = 0
+        tail = np.zeros(0, dtype=np.float32)
+        raw = _read_exact(process.stdout, window_samples * 2)
+        if not raw and process.wait() != 0:
+            raise RuntimeError(f"Failed to decode audio from: {video_path}")
+        while raw:
+            samples = np.concatenate([tail, _to_float(raw)])
+            next_raw = _read_exact(process.stdout, (window_samples - overlap_samples) * 2)
+            yield offset / rate, samples, not next_raw
+            tail = samples[len(samples) - overlap_samples:]
+            offset += len(samples) - len(tail)
+            raw = next_raw
+        finished = True
+    finally:
+        if not finished:
+            process.kill()
+        process.stdout.close()
+        process.wait()
+
+def iter_pcm_windows(samples, window, overlap):
+    window_samples = int(window * SAMPLE_RATE)
+    overlap_samples = int(overlap * SAMPLE_RATE)
+    total = len(samples)
+    position = 0
+    while True:
+        end = min(position + window_samples, total)
+        last = end >= total
+        yield position / SAMPLE_RATE, samples[position:end].astype(np.float32) / 32768.0, last
+        if last:
+            break
+        position = end - overlap_samples
@@ -0,0 +1,86 @@
+import re
+from src.utils import metrics
+from src.utils.subtitles import format_timestamp, parse_timestamp
+
+# Characters per line, lines per cue and seconds per cue for each output ratio; portrait frames fit far less
+CAPTION_LIMITS = {'9:16': (24, 2, 3.0), '1:1': (32, 2, 4.0), '16:9': (42, 2, 6.0)}
+PAUSE = 0.8
+# Scripts written without spaces between words (CJK, kana, Thai, Lao, Khmer, Myanmar)
+UNSPACED = re.compile(r'[\u0e00-\u0eff\u1000-\u109f\u1780-\u17ff\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]')
+SENTENCE_END = ('.', '!', '?', '。', '！', '？')
+
+def spread_words(start, end, text, max_chars):
+    # Text without word timings (translations) gives each word a share of the segment by length
+    tokens = []
+    for token in re.findall(r'\s*\S+', text):
+        word = token.strip()
+        if len(word) <= max_chars:
+            tokens.append(token)
+            continue
+        # Unspaced scripts come back as one long token; split it so it can still wrap
+        pieces = [word[i:i + max_chars] for i in range(0, len(word), max_chars)]
+        tokens += [token[:len(token) - len(word)] + pieces[0]] + pieces[1:]
+    total = sum(len(token.strip()) for token in tokens) or 1
+    words = []
+    position = start
+    for token in tokens:
+        share = (end - start) * len(token.strip()) / total
+        words.append({'start': position, 'end': position + share, 'word': token})
+        position += share
+    return words
+
+def pack_words(words, max_chars, max_lines, max_duration, pause=PAUSE):
+    # One pass: each word extends the current line, opens a new line or closes the cue.
+    # Words keep their leading whitespace, so scripts without spaces join correctly.
+    cues = []
+    lines = []
+    cue_start = cue_end = 0.0
+    for word in words:
+        token = word['word']
+        text = token.strip()
+        if not text:
+            continue
+        wraps = bool(lines) and len(lines[-1]) + len(token) > max_chars
+        if lines and (wraps and len(lines) == max_lines or word['end'] - cue_start > max_duration + 1e-6
+                      or word['start'] - cue_end >= pause):
+            cues.append((cue_start, cue_end, '\n'.join(lines)))
+            lines = []
+        if not lines:
+            lines = [text]
+            cue_start = word['start']
+        elif wraps:
+            lines.append(text)
+        else:
+            lines[-1] += token
+        cue_end = word['end']
+        if text.endswith(SENTENCE_END):
+            cues.append((cue_start, cue_end, '\n'.join(lines)))
+            lines = []
+    if lines:
+        cues.append((cue_start, cue_end, '\n'.join(lines)))
+    return cues
+
+def caption_words(subtitles, transcript, max_chars):
+    # Segments that came through untranslated keep their ASR word timings
+    words = []
+    for i, (start, end, text) in enumerate(subtitles):
+        segment = transcript[i] if transcript and i < len(transcript) else None
+        if segment and segment.get('words') and segment['text'] == text:
+            segment_words = segment['words']
+        else:
+            segment_words = spread_words(parse_timestamp(start), parse_timestamp(end), text, max_chars)
+        # Translations and clip subtitles don't start with a space; keep them from gluing onto the previous word
+        first = segment_words[0]['word'] if segment_words else ''
+        if words and first and not first[0].isspace() and not UNSPACED.match(first):
+            segment_words = [{**segment_words[0], 'word': ' ' + first}] + segment_words[1:]
+        words += segment_words
+    return words
+
+def pack_captions(subtitles, ratio, transcript=None):
+    # transcript[i] is the ASR segment subtitles[i] came from; repacking never runs a model
+    max_chars, max_lines, max_duration = CAPTION_LIMITS.get(ratio, CAPTION_LIMITS['16:9'])
+    with metrics.stage('captions', ratio=ratio) as record:
+        cues = pack_words(caption_words(subtitles, transcript, max_chars), max_chars, max_lines, max_duration)
+        record['segments'] = len(subtitles)
+        record['cues'] = len(cues)
+    return [(format_timestamp(start), format_timestamp(end), text) for start, end, text in cues]
@@ -0,0 +1,65 @@
+import os
+import shutil
+from src.utils import metrics
+from src.utils.media_probe import try_probe
+from src.utils.subtitles import write_srt
+from src.utils.cpu_budget import encode_stage, ffmpeg_global_args, ffmpeg_thread_args
+from src.processing.process_thread import build_video_filter, run_ffmpeg
+
+# Each input keeps its own decoder open, so very long clip lists are split into several runs
+CLIPS_PER_RUN = 4
+
+def build_clips_command(input_path, output_dir, aspect_ratio, font, color, info, batch, threads, subtitle_dir='temp'):
+    cmd = ['ffmpeg', *ffmpeg_global_args(threads)]
+    # Every clip decodes and encodes at the same time, so they split the thread budget
+    per_clip = max(1, threads // len(batch))
+    for index, start, end, subtitles in batch:
+        # Input-side -ss seeks straight to the nearest keyframe instead of decoding from 0
+        cmd += [*ffmpeg_thread_args(per_clip), '-ss', f"{start:.3f}", '-t', f"{end - start:.3f}", '-i', input_path]
+    graph = []
+    outputs = []
+    for i, (index, start, end, subtitles) in enumerate(batch):
+        subtitle_path = os.path.join(subtitle_dir, f"subtitle-clip{index:02d}.srt")
+        write_srt(subtitles, subtitle_path)
+        graph.append(f"[{i}:v]{build_video_filter(info, aspect_ratio, subtitle_path, font, color)}[v{i}]")
+        output_path = os.path.join(output_dir, f"short-{index:02d}.mp4")
+        outputs += ['-map', f"[v{i}]", '-map', f"{i}:a?", *ffmpeg_thread_args(per_clip), '-y', output_path]
+    return cmd + ['-filter_complex', ';'.join(graph)] + outputs
+
+def render_clips(input_path, output_dir, aspect_ratio, font, color, clips, on_progress, on_clip=None,
+                 subtitle_dir='temp'):
+    if not shutil.which('ffmpeg'):
+        raise RuntimeError("FFmpeg not found. Please install FFmpeg and add it to PATH.")
+    if not os.path.exists(input_path):
+        raise RuntimeError(f"Input file not found: {input_path}")
+    os.makedirs(subtitle_dir, exist_ok=True)
+    os.makedirs(output_dir, exist_ok=True)
+    info = try_probe(input_path)
+    if info and not info.video:
+        raise RuntimeError(f"No video stream found in: {input_path}")
+
+    clips = [(i, start, min(end, info.duration if info and info.duration else end), subtitles)
+             for i, (start, end, subtitles) in enumerate(clips, 1)]
+    total = sum(end - start for _, start, end, _ in clips)
+    done = 0.0
+    paths = []
+    for offset in range(0, len(clips), CLIPS_PER_RUN):
+        batch = clips[offset:offset + CLIPS_PER_RUN]
+        longest = max(end - start for _, start, end, _ in batch)
+        batch_total = sum(end - start for _, start, end, _ in batch)
+        # Outputs advance together, so batch progress follows the longest clip
+        batch_progress = lambda p: on_progress(min(int((done + batch_total * p / 100) / total * 100), 99))
+        with metrics.stage('render_clips', clips=len(batch), aspect_ratio=aspect_ratio) as record, \
+                encode_stage() as threads:
+            cmd = build_clips_command(input_path, output_dir, aspect_ratio, font, color, info, batch, threads, subtitle_dir)
+            returncode, stderr = run_ffmpeg(cmd, longest, batch_progress)
+            record['returncode'] = returncode
+        if returncode != 0:
+            raise RuntimeError(f"FFmpeg error: {stderr}")
+        done += batch_total
+        for index, start, end, subtitles in batch:
+            path = os.path.join(output_dir, f"short-{index:02d}.mp4")
+            paths.append(path)
+            if on_clip:
+                on_clip(path)
+    return paths
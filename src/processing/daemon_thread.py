@@ -0,0 +1,38 @@
+from PyQt6.QtCore import QThread, pyqtSignal
+
+class DaemonJobThread(QThread):
+    progress = pyqtSignal(int)
+    stage_event = pyqtSignal(str, str, float)
+    subtitles = pyqtSignal(list)
+    finished = pyqtSignal(str)
+    error = pyqtSignal(str)
+    # Emitted instead of submitting when the daemon does not answer, so the caller can render locally
+    unavailable = pyqtSignal()
+
+    def __init__(self, client, spec):
+        super().__init__()
+        self.client = client
+        self.spec = spec
+
+    def run(self):
+        if not self.client.is_available():
+            self.unavailable.emit()
+            return
+        try:
+            job = self.client.submit(self.spec)
+            for event in self.client.events(job['id']):
+                if event['event'] == 'progress' and event['stage'] == 'render':
+                    self.progress.emit(event['value'])
+                elif event['event'] == 'stage':
+                    self.stage_event.emit(event['stage'], event['status'], event['elapsed'])
+                elif event['event'] == 'subtitles':
+                    self.subtitles.emit([tuple(s) for s in event['subtitles']])
+                elif event['event'] == 'error':
+                    self.error.emit(event['message'])
+                    return
+                elif event['event'] == 'done':
+                    self.finished.emit('\n'.join(event['outputs']))
+                    return
+            self.error.emit("Connection to render daemon closed")
+        except Exception as e:
+            self.error.emit(f"Render daemon error: {str(e)}")
@@ -1,55 +1,108 @@
+import os
 import subprocess
-import re
 from PyQt6.QtCore import QThread, pyqtSignal
+from src.utils import metrics, profiling
+from src.utils.media_probe import try_probe, parse_duration, parse_progress_time
+from src.utils.cpu_budget import encode_stage, ffmpeg_global_args, ffmpeg_thread_args
+
+RESOLUTIONS = {'720p': '1280:720', '1080p': '1920:1080', '2K': '2560:1440', '4K': '3840:2160'}
+PROFILES = {
+    'Default': [],
+    'Fast': ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '23'],
+    'Quality': ['-c:v', 'libx264', '-preset', 'slow', '-crf', '18'],
+}
+
+def build_outputs(output_path, resolutions, profiles):
+    if len(resolutions) * len(profiles) == 1:
+        return [(resolutions[0], profiles[0], output_path.replace('{resolution}', resolutions[0]))]
+    if '{resolution}' not in output_path:
+        # Without a placeholder every output would overwrite the same file
+        root, ext = os.path.splitext(output_path)
+        output_path = root + '-{resolution}' + ext
+    outputs = []
+    for resolution in resolutions:
+        for profile in profiles:
+            name = resolution if len(profiles) == 1 else f"{resolution}-{profile}"
+            outputs.append((resolution, profile, output_path.replace('{resolution}', name)))
+    return outputs
+
+def build_export_command(input_path, outputs, copy_audio=False, threads=None):
+    labels = [f"[s{i}]" for i in range(len(outputs))]
+    graph = [f"[0:v]split={len(outputs)}{''.join(labels)}"] if len(outputs) > 1 else []
+    source = labels if len(outputs) > 1 else ['[0:v]']
+    for i, (resolution, profile, path) in enumerate(outputs):
+        scale = RESOLUTIONS.get(resolution, RESOLUTIONS['4K'])
+        graph.append(f"{source[i]}scale={scale}[v{i}]")
+    cmd = ['ffmpeg']
+    if threads:
+        cmd += [*ffmpeg_global_args(threads), *ffmpeg_thread_args(threads)]
+    cmd += ['-i', input_path, '-filter_complex', ';'.join(graph)]
+    for i, (resolution, profile, path) in enumerate(outputs):
+        cmd += ['-map', f"[v{i}]", '-map', '0:a?']
+        cmd += PROFILES.get(profile, [])
+        if threads:
+            # Encoders run side by side, one per output
+            cmd += ffmpeg_thread_args(max(1, threads // len(outputs)))
+        if copy_audio:
+            cmd += ['-c:a', 'copy']
+        cmd += ['-y', path]
+    return cmd
+
+def export_video(input_path, output_path, resolution, profiles, on_progress, on_output_progress=None):
+    resolutions = [resolution] if isinstance(resolution, str) else list(resolution)
+    outputs = build_outputs(output_path, resolutions, list(profiles))
+    on_output_progress = on_output_progress or (lambda path, value: None)
+
+    info = try_probe(input_path)
+    duration = info.duration if info else None
+    copy_audio = bool(info and info.audio and info.audio.codec_name in ('aac', 'mp3'))
+    with metrics.stage('export', resolutions=[o[0] for o in outputs], outputs=len(outputs)) as record, \
+            encode_stage() as threads:
+        job = metrics.current_job()
+        cmd = build_export_command(input_path, outputs, copy_audio, threads)
+        cmd = [cmd[0], *profiling.ffmpeg_args(job), *cmd[1:]]
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+        for line in process.stdout:
+            profiling.record_ffmpeg(job, 'export', line)
+            if duration is None:
+                duration = parse_duration(line)
+            current_time = parse_progress_time(line)
+            if current_time is not None and duration:
+                percent = min(int((current_time / duration) * 100), 100)
+                on_progress(percent)
+                # A single ffmpeg run feeds every output from the same decoded frames
+                for _, _, path in outputs:
+                    on_output_progress(path, percent)
+
+        process.wait()
+        record['returncode'] = process.returncode
+    if process.returncode != 0:
+        raise RuntimeError("Error exporting video")
+    for _, _, path in outputs:
+        on_output_progress(path, 100)
+    return [path for _, _, path in outputs]
 
 class ExportThread(QThread):
     progress = pyqtSignal(int)
+    output_progress = pyqtSignal(str, int)
     finished = pyqtSignal(str)
     error = pyqtSignal(str)
 
-    def __init__(self, input_path, output_path, resolution):
+    def __init__(self, input_path, output_path, resolution, profiles=None):
         super().__init__()
         self.input_path = input_path
         self.output_path = output_path
         self.resolution = resolution
+        self.profiles = profiles or ['Default']
 
     def run(self):
+        with profiling.thread(metrics.current_job()):
+            self.export()
+
+    def export(self):
         try:
-            if self.resolution == '720p':
-                scale = 'scale=1280:720'
-            elif self.resolution == '1080p':
-                scale = 'scale=1920:1080'
-            elif self.resolution == '2K':
-                scale = 'scale=2560:1440'
-            else:
-                scale = 'scale=3840:2160'
-
-            cmd = [
-                'ffmpeg', '-i', self.input_path,
-                '-vf', scale,
-                '-y', self.output_path
-            ]
-
-            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
-            duration = None
-            for line in process.stdout:
-                if duration is None and 'Duration' in line:
-                    match = re.search(r'Duration: (\d+):(\d+):(\d+.\d+)', line)
-                    if match:
-                        hours, minutes, seconds = map(float, match.groups())
-                        duration = hours * 3600 + minutes * 60 + seconds
-                if 'time=' in line and duration:
-                    match = re.search(r'time=(\d+):(\d+):(\d+.\d+)', line)
-                    if match:
-                        hours, minutes, seconds = map(float, match.groups())
-                        current_time = hours * 3600 + minutes * 60 + seconds
-                        percent = int((current_time / duration) * 100)
-                        self.progress.emit(min(percent, 100))
-
-            process.wait()
-            if process.returncode == 0:
-                self.finished.emit(self.output_path)
-            else:
-                self.error.emit("Error exporting video")
+            paths = export_video(self.input_path, self.output_path, self.resolution, self.profiles,
+                                 self.progress.emit, self.output_progress.emit)
+            self.finished.emit('\n'.join(paths))
         except Exception as e:
-            self.error.emit(str(e))
\ No newline at end of file
+            self.error.emit(str(e))
@@ -0,0 +1,77 @@
+import subprocess
+import numpy as np
+from PyQt6.QtCore import QThread, pyqtSignal
+from src.utils import metrics
+from src.utils.media_probe import try_probe
+from src.utils.artifact_store import store, file_hash
+
+THUMB_COUNT = 120
+THUMB_HEIGHT = 72
+# Keyframes usually come at least this often (camera and YouTube encodes use 2-10 s GOPs),
+# so thumbnail slots this far apart can be filled from keyframes alone
+KEYFRAME_SPACING = 10.0
+
+def thumb_size(info, height=THUMB_HEIGHT):
+    width = round(height * info.width / info.height) if info.height else height * 16 // 9
+    return width + width % 2, height
+
+def filmstrip_command(path, count, duration, width, height, keyframes_only=False):
+    # fps=count/duration spreads the thumbnails evenly; decoding keyframes only is enough when
+    # the slots are further apart than the keyframes
+    cmd = ['ffmpeg', '-nostdin', '-v', 'error']
+    if keyframes_only:
+        cmd += ['-skip_frame', 'nokey']
+    cmd += ['-i', path, '-an', '-sn',
+            '-vf', f"fps={count}/{duration:.3f},scale={width}:{height}",
+            '-frames:v', str(count), '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-']
+    return cmd
+
+def build_filmstrip(path, count=THUMB_COUNT, height=THUMB_HEIGHT):
+    info = try_probe(path)
+    if not info:
+        raise RuntimeError(f"Could not probe video: {path}")
+    if not info.video or not info.duration:
+        raise RuntimeError(f"No video stream found in: {path}")
+    width, height = thumb_size(info, height)
+    frame_size = width * height * 3
+    keyframes_only = info.duration / count >= KEYFRAME_SPACING
+    result, frames = _decode(path, count, info.duration, width, height, keyframes_only)
+    if keyframes_only and frames < count // 2:
+        # Sparser keyframes than expected; decode every frame rather than stretch a few thumbnails
+        result, frames = _decode(path, count, info.duration, width, height, False)
+    atlas = np.frombuffer(result.stdout[:frames * frame_size], dtype=np.uint8).reshape(frames, height, width, 3)
+    if 0 < frames < count:
+        # Keyframe-only decoding can stop short at the last keyframe; hold it so slots stay evenly spaced
+        atlas = np.concatenate([atlas, np.repeat(atlas[-1:], count - frames, axis=0)])
+    return atlas
+
+def _decode(path, count, duration, width, height, keyframes_only):
+    with metrics.stage('filmstrip', count=count, keyframes_only=keyframes_only):
+        result = subprocess.run(filmstrip_command(path, count, duration, width, height, keyframes_only),
+                                capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg error: {result.stderr.decode('utf-8', 'replace')[-2000:]}")
+    return result, len(result.stdout) // (width * height * 3)
+
+def load_filmstrip(path, count=THUMB_COUNT, height=THUMB_HEIGHT):
+    def build(tmp_path):
+        with open(tmp_path, 'wb') as f:
+            np.save(f, build_filmstrip(path, count, height))
+
+    atlas_path = store.produce(store.key('filmstrip', file_hash(path), count, height), '.npy', build)
+    return np.load(atlas_path, mmap_mode='r')
+
+class FilmstripThread(QThread):
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+    def __init__(self, video_path, count=THUMB_COUNT):
+        super().__init__()
+        self.video_path = video_path
+        self.count = count
+
+    def run(self):
+        try:
+            self.finished.emit(np.ascontiguousarray(load_filmstrip(self.video_path, self.count)))
+        except Exception as e:
+            self.error.emit(str(e))
@@ -0,0 +1,270 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+from src.utils import metrics, profiling
+from src.utils.media_probe import try_probe
+from src.utils.subtitles import parse_time_ranges
+from src.utils.youtube_downloader import download_youtube_video
+from src.utils.artifact_store import store, file_hash
+from src.processing.ai_processor import (generate_clip_subtitles, stream_segments, translate_stream, detect_source_language,
+                                        segment_to_subtitle, translation_models)
+from src.processing.asr import ASR_BACKEND, get_backend
+from src.processing.audio_stream import SAMPLE_RATE, decode_pcm, open_pcm
+from src.processing.captions import pack_captions
+from src.processing.silence import detect_segments
+from src.processing.pipeline import Channel, StageGraph
+from src.processing.window import parse_start, plan_window, extraction_range, rebase_segment
+from src.processing.process_thread import render_video, SCALES, DURATION_MAP
+from src.processing.clips import render_clips
+from src.processing.export_thread import export_video, RESOLUTIONS, PROFILES
+
+DEFAULTS = {
+    'ratio': '9:16',
+    'language': 'English',
+    'duration': 'Auto',
+    'start': 0,
+    'jump_cut': False,
+    'profiling': False,
+    'asr_backend': ASR_BACKEND,
+    'font': 'Arial',
+    'color': '#ffffff',
+    'clips': '',
+    'export': [],
+    'profile': 'Default',
+}
+
+def is_url(source):
+    return source.startswith(('http://', 'https://'))
+
+def normalize_spec(spec):
+    if not spec.get('source'):
+        raise ValueError("Job needs a source path or URL")
+    spec = {**DEFAULTS, **spec}
+    if spec['ratio'] not in SCALES:
+        raise ValueError(f"Unknown aspect ratio: {spec['ratio']}")
+    if spec['duration'] not in DURATION_MAP:
+        raise ValueError(f"Unknown duration: {spec['duration']}")
+    if isinstance(spec['export'], str):
+        spec['export'] = [r.strip() for r in spec['export'].split(',') if r.strip()]
+    for resolution in spec['export']:
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown export resolution: {resolution}")
+    if spec['profile'] not in PROFILES:
+        raise ValueError(f"Unknown encoding profile: {spec['profile']}")
+    spec['start'] = parse_start(spec['start'])
+    spec['jump_cut'] = bool(spec['jump_cut'])
+    spec['profiling'] = bool(spec['profiling'])
+    spec['asr_backend'] = get_backend(spec['asr_backend']).name
+    if isinstance(spec['clips'], str):
+        spec['clips'] = parse_time_ranges(spec['clips'])
+    if not is_url(spec['source']) and not os.path.exists(spec['source']):
+        raise ValueError(f"Input file not found: {spec['source']}")
+    return spec
+
+def link_output(path, output_path):
+    try:
+        os.link(path, output_path)
+    except OSError:
+        shutil.copyfile(path, output_path)
+    return output_path
+
+def add_single_stages(graph, source, spec, job_dir, output_dir, emit, progress, pins):
+    segments = Channel()
+
+    def window(results):
+        return plan_window(source, float(DURATION_MAP[spec['duration']]), spec['start'],
+                           results['probe'].duration if results['probe'] else None)
+
+    def audio(results):
+        extract_start, extract_duration = extraction_range(*results['window'])
+        key = store.key('pcm', file_hash(source), extract_start, extract_duration, SAMPLE_RATE)
+        path = store.produce(key, '.pcm', lambda tmp: decode_pcm(source, tmp, extract_start, extract_duration), pin=True)
+        pins.append(path)
+        return path
+
+    def language(results):
+        # The PCM path is content-addressed, so its name keys everything derived from the audio
+        key = store.key('language', os.path.basename(results['audio']), get_backend(spec['asr_backend']).model_id)
+
+        def detect(tmp):
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(detect_source_language(source, results['audio'], backend=spec['asr_backend']) or '')
+
+        with open(store.produce(key, '.txt', detect), encoding='utf-8') as f:
+            return f.read() or None
+
+    def transcript_key(results):
+        return store.key('transcript', os.path.basename(results['audio']), get_backend(spec['asr_backend']).model_id,
+                         results['language'])
+
+    def asr(results):
+        # Word timings are cached with the transcript so captions can be repacked without the model
+        start, length = results['window']
+        extract_start = extraction_range(start, length)[0]
+        transcript = []
+
+        def push(segment):
+            # Segments that only touch the margin are dropped before they reach translation
+            rebased = rebase_segment(segment, start, length, extract_start)
+            if rebased:
+                transcript.append(rebased)
+                segments.put(segment_to_subtitle(rebased))
+
+        def transcribe(tmp):
+            raw = []
+            for segment in stream_segments(source, pcm_path=results['audio'], language=results['language'],
+                                           backend=spec['asr_backend'], words=True):
+                raw.append(segment)
+                push(segment)
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(raw, f, ensure_ascii=False)
+
+        try:
+            path = store.produce(transcript_key(results), '.json', transcribe)
+            if not transcript:
+                with open(path, encoding='utf-8') as f:
+                    for segment in json.load(f):
+                        push(segment)
+        except BaseException as e:
+            # A partial stream must not end up in the translation cache
+            segments.fail(e)
+            raise
+        segments.close()
+        return transcript
+
+    def translate(results):
+        # Runs alongside ASR and translates each segment as soon as it is transcribed. The result is cached
+        # too, so a job that only changes the ratio repacks captions without loading any model.
+        try:
+            route = translation_models(spec['language'], results['language'])
+        except ValueError:
+            route = []
+        key = store.key('translation', transcript_key(results), results['window'], spec['language'], route)
+
+        def build(tmp):
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(list(translate_stream(segments, spec['language'], results['language'])), f, ensure_ascii=False)
+
+        with open(store.produce(key, '.json', build), encoding='utf-8') as f:
+            return [tuple(subtitle) for subtitle in json.load(f)]
+
+    def captions(results):
+        subtitles = pack_captions(results['translate'], spec['ratio'], results['asr'])
+        emit({'event': 'subtitles', 'subtitles': subtitles})
+        return subtitles
+
+    def silence(results):
+        # The PCM starts at the margin before the window; only the window itself is analysed
+        start, length = results['window']
+        skip = int((start - extraction_range(start, length)[0]) * SAMPLE_RATE)
+        return detect_segments(open_pcm(results['audio'])[skip:skip + int(length * SAMPLE_RATE)], length)
+
+    def render(results):
+        start = results['window'][0]
+        segments = results.get('silence')
+        key = store.key('render', file_hash(source), spec['ratio'], spec['font'], spec['color'], spec['duration'], start,
+                        subtitles=results['captions'], segments=segments)
+        path = store.produce(key, '.mp4', lambda tmp: render_video(
+            source, tmp, spec['ratio'], spec['font'], spec['color'], results['captions'], spec['duration'],
+            progress('render'), subtitle_path=os.path.join(job_dir, 'subtitle.srt'), start=start,
+            segments=segments), pin=True)
+        pins.append(path)
+        if output_dir:
+            path = link_output(path, os.path.join(output_dir, 'processed.mp4'))
+        emit({'event': 'output', 'path': path})
+        return [path]
+
+    graph.add('window', window, deps=['probe'])
+    graph.add('audio', audio, deps=['window'])
+    graph.add('language', language, deps=['audio'])
+    graph.add('asr', asr, deps=['window', 'audio', 'language'])
+    graph.add('translate', translate, deps=['window', 'audio', 'language'])
+    graph.add('captions', captions, deps=['asr', 'translate'])
+    if spec['jump_cut']:
+        graph.add('silence', silence, deps=['window', 'audio'])
+    graph.add('render', render, deps=['window', 'captions'] + (['silence'] if spec['jump_cut'] else []))
+
+def add_clip_stages(graph, source, spec, job_dir, emit, progress):
+    def transcribe(results):
+        subtitles, clip_subtitles = generate_clip_subtitles(source, spec['language'], spec['clips'], spec['asr_backend'])
+        emit({'event': 'subtitles', 'subtitles': subtitles})
+        return [pack_captions(subs, spec['ratio']) for subs in clip_subtitles]
+
+    def render(results):
+        clips = [(start, end, subs) for (start, end), subs in zip(spec['clips'], results['transcribe'])]
+        return render_clips(source, job_dir, spec['ratio'], spec['font'], spec['color'], clips, progress('render'),
+                            lambda path: emit({'event': 'output', 'path': path}), subtitle_dir=job_dir)
+
+    graph.add('transcribe', transcribe)
+    graph.add('render', render, deps=['probe', 'transcribe'])
+
+def run_job(job_id, spec, emit, output_root='output'):
+    # output_root=None leaves single renders in the artifact store; the caller pins what it keeps using
+    spec = normalize_spec(spec)
+    # Clip lists are deliverables and always get an output directory
+    output_dir = os.path.join(output_root or 'output', job_id) if output_root or spec['clips'] else None
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    os.makedirs('temp', exist_ok=True)
+    job_dir = output_dir or tempfile.mkdtemp(prefix=f"job-{job_id}-", dir='temp')
+    pins = []
+
+    def progress(stage):
+        return lambda value: emit({'event': 'progress', 'stage': stage, 'value': value})
+
+    started = time.perf_counter()
+
+    def stage_event(name, status, elapsed=None):
+        if elapsed is None:
+            elapsed = round(time.perf_counter() - started, 3)
+        emit({'event': 'stage', 'stage': name, 'status': status, 'elapsed': elapsed})
+
+    job = metrics.Job(spec.get('name', 'job'), job_id, profile=spec['profiling'] or None)
+    with metrics.use_job(job), profiling.thread(job):
+        try:
+            source = spec['source']
+            if is_url(source):
+                stage_event('download', 'running')
+                source = download_youtube_video(source)
+                if not source:
+                    stage_event('download', 'error')
+                    raise RuntimeError("Failed to load video")
+                stage_event('download', 'done')
+            store.pin(source)
+            pins.append(source)
+
+            graph = StageGraph(stage_event, started)
+            graph.add('probe', lambda results: try_probe(source))
+            if spec['clips']:
+                add_clip_stages(graph, source, spec, job_dir, emit, progress)
+            else:
+                add_single_stages(graph, source, spec, job_dir, output_dir, emit, progress, pins)
+            if spec['export']:
+                def export(results):
+                    exported = []
+                    export_dir = output_dir or os.path.join('output', job_id)
+                    os.makedirs(export_dir, exist_ok=True)
+                    for path in results['render']:
+                        name = os.path.splitext(os.path.basename(path))[0] if output_dir else 'processed'
+                        template = os.path.join(export_dir, name + '-{resolution}.mp4')
+                        for output in export_video(path, template, spec['export'], [spec['profile']], progress('export')):
+                            emit({'event': 'output', 'path': output})
+                            exported.append(output)
+                    return exported
+                graph.add('export', export, deps=['render'])
+            results = graph.run()
+            outputs = results['render'] + results.get('export', [])
+        except Exception:
+            job.finish('error')
+            raise
+        finally:
+            for path in pins:
+                store.unpin(path)
+            if not output_dir:
+                shutil.rmtree(job_dir, ignore_errors=True)
+    job.finish('ok')
+    if job.profile:
+        emit({'event': 'profile', 'path': job.profile.summary_path})
+    return outputs
@@ -0,0 +1,141 @@
+import os
+import threading
+import whisper
+from transformers import pipeline
+from src.utils import metrics
+from src.utils.cpu_budget import budget
+
+# APPCUTSHORT_QUANTIZE=1 runs Whisper and MarianMT with int8 dynamic quantization of their Linear layers
+QUANTIZE = os.environ.get('APPCUTSHORT_QUANTIZE', '') == '1'
+WHISPER_MODEL = os.environ.get('APPCUTSHORT_WHISPER_MODEL', 'base')
+MODEL_CACHE_DIR = os.path.join('temp', 'models')
+
+_models = {}
+_inference_locks = {}
+_lock = threading.Lock()
+_inference_locks_lock = threading.Lock()
+
+def _dynamic_linear():
+    import torch
+    from torch.ao.nn.quantized.dynamic import Linear as DynamicLinear
+
+    class SubclassDynamicLinear(DynamicLinear):
+        # DynamicLinear.from_float only accepts the exact nn.Linear type; Whisper subclasses it
+        @classmethod
+        def from_float(cls, module, *args, **kwargs):
+            plain = torch.nn.Linear(module.in_features, module.out_features, bias=module.bias is not None)
+            plain.load_state_dict(module.state_dict())
+            plain.qconfig = module.qconfig
+            return DynamicLinear.from_float(plain, *args, **kwargs)
+
+    return DynamicLinear, SubclassDynamicLinear
+
+def quantize_model(model):
+    import torch
+    from torch.ao.quantization.quantization_mappings import get_default_dynamic_quant_module_mappings
+    DynamicLinear, SubclassDynamicLinear = _dynamic_linear()
+    # quantize_dynamic matches exact module types, so whisper.model.Linear needs its own entry
+    qconfig = torch.ao.quantization.default_dynamic_qconfig
+    spec = {torch.nn.Linear: qconfig, whisper.model.Linear: qconfig}
+    mapping = {**get_default_dynamic_quant_module_mappings(), whisper.model.Linear: SubclassDynamicLinear}
+    quantized = torch.ao.quantization.quantize_dynamic(model, spec, dtype=torch.qint8, mapping=mapping)
+    if not any(isinstance(module, DynamicLinear) for module in quantized.modules()):
+        raise RuntimeError(f"Dynamic quantization left no int8 Linear layers in {type(model).__name__}")
+    return quantized
+
+def _library_versions():
+    import torch
+    import transformers
+    return f"torch{torch.__version__}-whisper{getattr(whisper, '__version__', '0')}-transformers{transformers.__version__}"
+
+def _load_quantized(name, load):
+    import torch
+    # Only the int8 state_dict is cached; the module structure is rebuilt by quantizing the fresh fp32 model,
+    # so nothing is unpickled and a stale or corrupt file is simply replaced
+    path = os.path.join(MODEL_CACHE_DIR, f"{name.replace('/', '--')}-{_library_versions().replace('+', '_')}-int8.pt")
+    model = load()
+    with metrics.stage('quantize', model=name) as record:
+        quantized = quantize_model(model)
+        record['cached'] = os.path.exists(path)
+        if record['cached']:
+            try:
+                quantized.load_state_dict(torch.load(path, weights_only=True))
+                return quantized
+            except Exception:
+                record['cached'] = False
+                os.remove(path)
+    os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+    torch.save(quantized.state_dict(), path + '.tmp')
+    os.replace(path + '.tmp', path)
+    return quantized
+
+def _cached(key, load):
+    with _lock:
+        model = _models.get(key)
+        if model is None:
+            model = load()
+            _models[key] = model
+        return model
+
+def load_whisper_model(name=None, quantize=None):
+    name = name or WHISPER_MODEL
+    quantize = QUANTIZE if quantize is None else quantize
+
+    def load():
+        with metrics.stage('model_load', model=f"whisper-{name}", quantized=quantize):
+            if quantize:
+                return _load_quantized(f"whisper-{name}", lambda: whisper.load_model(name, device='cpu'))
+            return whisper.load_model(name)
+
+    return _cached(('whisper', name, quantize), load)
+
+def load_faster_whisper_model(name=None, compute_type='int8'):
+    name = name or WHISPER_MODEL
+
+    def load():
+        from faster_whisper import WhisperModel
+        with metrics.stage('model_load', model=f"faster-whisper-{name}", compute_type=compute_type):
+            # CTranslate2 sizes its thread pool once at load, so it gets the ML share of the budget up front
+            threads = max(1, round(budget.cores * budget.ml_share))
+            return WhisperModel(name, device='cpu', compute_type=compute_type, cpu_threads=threads,
+                                download_root=os.path.join(MODEL_CACHE_DIR, 'ctranslate2'))
+
+    return _cached(('faster-whisper', name, compute_type), load)
+
+def load_translator(model_name, quantize=None):
+    quantize = QUANTIZE if quantize is None else quantize
+
+    def load():
+        with metrics.stage('model_load', model=model_name, quantized=quantize):
+            if quantize:
+                from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+                model = _load_quantized(model_name, lambda: AutoModelForSeq2SeqLM.from_pretrained(model_name))
+                return pipeline("translation", model=model, tokenizer=AutoTokenizer.from_pretrained(model_name))
+            return pipeline("translation", model=model_name)
+
+    return _cached(('translator', model_name, quantize), load)
+
+def detect_language(model, samples):
+    # English-only checkpoints have no language head
+    if not getattr(model, 'is_multilingual', True):
+        return 'en', 1.0
+    mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(samples), model.dims.n_mels).to(model.device)
+    _, probs = model.detect_language(mel)
+    language = max(probs, key=probs.get)
+    return language, probs[language]
+
+def inference_lock(model):
+    # Whisper installs decoding hooks on the model per call, so one model can't serve two threads at once
+    with _inference_locks_lock:
+        return _inference_locks.setdefault(id(model), threading.Lock())
+
+def transcribe_options(quantize=None):
+    quantize = QUANTIZE if quantize is None else quantize
+    # Quantized kernels only exist on CPU, where fp16 decoding is not available
+    return {'fp16': False} if quantize else {}
+
+def clear_cache():
+    with _lock:
+        _models.clear()
+    with _inference_locks_lock:
+        _inference_locks.clear()
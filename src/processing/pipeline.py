@@ -0,0 +1,76 @@
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from src.utils import metrics, profiling
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+class Channel:
+    _CLOSED = object()
+
+    def __init__(self):
+        self._queue = queue.Queue()
+
+    def put(self, item):
+        self._queue.put(item)
+
+    def close(self):
+        self._queue.put(self._CLOSED)
+
+    def fail(self, error):
+        # The consumer raises instead of mistaking a broken producer for the end of the stream
+        self._queue.put(_Failure(error))
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is self._CLOSED:
+                return
+            if isinstance(item, _Failure):
+                raise RuntimeError(f"Upstream stage failed: {item.error}") from item.error
+            yield item
+
+class StageGraph:
+    def __init__(self, on_event=None, started=None):
+        self.stages = {}
+        self.results = {}
+        self.on_event = on_event or (lambda name, status, elapsed: None)
+        self.started = started
+
+    def add(self, name, func, deps=()):
+        # func receives the results of finished stages; a stage starts as soon as all its deps are done
+        self.stages[name] = (func, tuple(deps))
+
+    def _call(self, job, func):
+        with metrics.use_job(job), profiling.thread(job):
+            return func(self.results)
+
+    def run(self):
+        started = self.started or time.perf_counter()
+        elapsed = lambda: round(time.perf_counter() - started, 3)
+        job = metrics.current_job()
+        pending = dict(self.stages)
+        running = {}
+        with ThreadPoolExecutor(max_workers=max(1, len(self.stages)), thread_name_prefix='stage') as executor:
+            while pending or running:
+                for name, (func, deps) in list(pending.items()):
+                    if all(dep in self.results for dep in deps):
+                        del pending[name]
+                        self.on_event(name, 'running', elapsed())
+                        running[executor.submit(self._call, job, func)] = name
+                if not running:
+                    raise RuntimeError(f"Unresolvable stage dependencies: {', '.join(pending)}")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self.results[name] = future.result()
+                    except Exception:
+                        self.on_event(name, 'error', elapsed())
+                        for skipped in pending:
+                            self.on_event(skipped, 'skipped', elapsed())
+                        raise
+                    self.on_event(name, 'done', elapsed())
+        return self.results
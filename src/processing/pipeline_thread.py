@@ -0,0 +1,31 @@
+import uuid
+from PyQt6.QtCore import QThread, pyqtSignal
+from src.processing.jobs import run_job
+
+class PipelineThread(QThread):
+    progress = pyqtSignal(int)
+    stage_event = pyqtSignal(str, str, float)
+    subtitles = pyqtSignal(list)
+    finished = pyqtSignal(str)
+    error = pyqtSignal(str)
+
+    def __init__(self, spec, output_root=None):
+        super().__init__()
+        self.spec = spec
+        self.output_root = output_root
+
+    def handle_event(self, event):
+        if event['event'] == 'progress' and event['stage'] == 'render':
+            self.progress.emit(event['value'])
+        elif event['event'] == 'stage':
+            self.stage_event.emit(event['stage'], event['status'], event['elapsed'])
+        elif event['event'] == 'subtitles':
+            self.subtitles.emit([tuple(s) for s in event['subtitles']])
+
+    def run(self):
+        try:
+            outputs = run_job(uuid.uuid4().hex[:12], self.spec, self.handle_event, self.output_root)
+            self.progress.emit(100)
+            self.finished.emit('\n'.join(outputs))
+        except Exception as e:
+            self.error.emit(str(e))
@@ -2,14 +2,100 @@ import os
 import subprocess
 import re
 import shutil
+from collections import deque
 from PyQt6.QtCore import QThread, pyqtSignal
+from src.utils import metrics, profiling
+from src.utils.media_probe import try_probe, parse_progress_time
+from src.utils.subtitles import write_srt
+from src.utils.cpu_budget import encode_stage, ffmpeg_global_args, ffmpeg_thread_args
+from src.processing.silence import cut_filters, remap_subtitles
+
+SCALES = {'9:16': '1080:1920', '16:9': '1920:1080', '1:1': '1080:1080'}
+DURATION_MAP = {'Auto': '60', '<30s': '30', '30s - 60s': '60', '60s - 90s': '90', '90s - 3min': '180'}
+
+def ffmpeg_color(color):
+    color = color.lstrip('#')
+    return f"&H{color[4:6]}{color[2:4]}{color[0:2]}"
+
+def build_video_filter(info, aspect_ratio, subtitle_path, font, color):
+    scale = SCALES[aspect_ratio]
+    filters = []
+    # Without probe info the frame is always scaled and padded
+    if not info or f"{info.width}:{info.height}" != scale:
+        filters.append(f"scale={scale}:force_original_aspect_ratio=decrease,pad={scale}:(ow-iw)/2:(oh-ih)/2")
+    filters.append(f"subtitles='{subtitle_path}':force_style='FontName={font},PrimaryColour={ffmpeg_color(color)}'")
+    return ','.join(filters)
+
+def run_ffmpeg(cmd, total, on_progress):
+    job = metrics.current_job()
+    cmd = [cmd[0], *profiling.ffmpeg_args(job), *cmd[1:]]
+    process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True)
+    stderr = deque(maxlen=40)
+    for line in process.stderr:
+        stderr.append(line)
+        profiling.record_ffmpeg(job, os.path.basename(cmd[-1]), line)
+        current_time = parse_progress_time(line)
+        if current_time is not None and total:
+            on_progress(min(int(current_time / total * 100), 99))
+    process.wait()
+    return process.returncode, ''.join(stderr)
+
+def render_video(input_path, output_path, aspect_ratio, font, color, subtitles, duration, on_progress,
+                 subtitle_path=None, start=0, segments=None):
+    if not shutil.which('ffmpeg'):
+        raise RuntimeError("FFmpeg not found. Please install FFmpeg and add it to PATH.")
+    if not os.path.exists('temp'):
+        os.makedirs('temp')
+    if not os.path.exists(input_path):
+        raise RuntimeError(f"Input file not found: {input_path}")
+    # ffprobe is optional: without it the render skips the same-size shortcut and exact progress
+    info = try_probe(input_path)
+    if info and not info.video:
+        raise RuntimeError(f"No video stream found in: {input_path}")
+
+    subtitle_path = subtitle_path or os.path.join('temp', 'subtitle.srt')
+    if segments:
+        subtitles = remap_subtitles(subtitles, segments)
+    write_srt(subtitles, subtitle_path)
+
+    max_duration = DURATION_MAP.get(duration, '60')
+    total = min(info.duration - start, float(max_duration)) if info and info.duration else float(max_duration)
+    # Input-side seek: timestamps restart at zero, matching subtitles re-based to the window
+    seek = ['-ss', f"{start:.3f}"] if start else []
+    video_filter = build_video_filter(info, aspect_ratio, subtitle_path, font, color)
+    filters = ['-vf', video_filter]
+    if segments:
+        # Jump cuts run first so the burned-in subtitles follow the cut timeline. The expressions grow
+        # with the number of cuts, so they go through filter scripts instead of the command line.
+        video_cut, audio_cut = cut_filters(segments)
+        script_base = os.path.splitext(subtitle_path)[0]
+        with open(script_base + '.vf', 'w', encoding='utf-8') as f:
+            f.write(f"{video_cut},{video_filter}")
+        with open(script_base + '.af', 'w', encoding='utf-8') as f:
+            f.write(audio_cut)
+        filters = ['-filter_script:v', script_base + '.vf', '-filter_script:a', script_base + '.af']
+        seek += ['-t', f"{segments[-1][1]:.3f}"]
+        total = min(total, sum(end - begin for begin, end in segments))
+
+    with metrics.stage('render', aspect_ratio=aspect_ratio, source_duration=info.duration if info else None) as record, \
+            encode_stage() as threads:
+        cmd = [
+            'ffmpeg', *ffmpeg_global_args(threads), *ffmpeg_thread_args(threads), *seek, '-i', input_path,
+            *filters,
+            *ffmpeg_thread_args(threads), '-t', max_duration, '-y', output_path
+        ]
+        returncode, stderr = run_ffmpeg(cmd, total, on_progress)
+        record['returncode'] = returncode
+    if returncode != 0:
+        raise RuntimeError(f"FFmpeg error: {stderr}")
+    return output_path
 
 class ProcessThread(QThread):
     progress = pyqtSignal(int)
     finished = pyqtSignal(str)
     error = pyqtSignal(str)
 
-    def __init__(self, input_path, output_path, aspect_ratio, font, color, subtitles, language, duration):
+    def __init__(self, input_path, output_path, aspect_ratio, font, color, subtitles, language, duration, start=0):
         super().__init__()
         self.input_path = input_path
         self.output_path = output_path
@@ -19,40 +105,19 @@ class ProcessThread(QThread):
         self.subtitles = subtitles
         self.language = language
         self.duration = duration
+        self.start_time = start
 
     def run(self):
+        with profiling.thread(metrics.current_job()):
+            self.render()
+
+    def render(self):
         try:
-            if not shutil.which('ffmpeg'):
-                self.error.emit("FFmpeg not found. Please install FFmpeg and add it to PATH.")
-                return
-            if not os.path.exists('temp'):
-                os.makedirs('temp')
-            if not os.path.exists(self.input_path):
-                self.error.emit(f"Input file not found: {self.input_path}")
-                return
-
-            subtitle_path = os.path.join('temp', 'subtitle.srt')
-            with open(subtitle_path, 'w', encoding='utf-8') as f:
-                for i, (start, end, text) in enumerate(self.subtitles, 1):
-                    f.write(f"{i}\n{start} --> {end}\n{text}\n\n")
-
-            scale = {'9:16': '1080:1920', '16:9': '1920:1080', '1:1': '1080:1080'}[self.aspect_ratio]
-            color = self.color.lstrip('#')
-            color = f"&H{color[4:6]}{color[2:4]}{color[0:2]}"
-            duration_map = {'Auto': '60', '<30s': '30', '30s - 60s': '60', '60s - 90s': '90', '90s - 3min': '180'}
-            max_duration = duration_map.get(self.duration, '60')
-
-            cmd = [
-                'ffmpeg', '-i', self.input_path,
-                '-vf', f"scale={scale}:force_original_aspect_ratio=decrease,pad={scale}:(ow-iw)/2:(oh-ih)/2,subtitles='{subtitle_path}':force_style='FontName={self.font},PrimaryColour={color}'",
-                '-t', max_duration, '-y', self.output_path
-            ]
-            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
-            stdout, stderr = process.communicate()
-            if process.returncode != 0:
-                self.error.emit(f"FFmpeg error: {stderr}")
-                return
+            render_video(self.input_path, self.output_path, self.aspect_ratio, self.font, self.color,
+                         self.subtitles, self.duration, self.progress.emit, start=self.start_time)
             self.progress.emit(100)
             self.finished.emit(self.output_path)
+        except RuntimeError as e:
+            self.error.emit(str(e))
         except Exception as e:
-            self.error.emit(f"Unexpected error: {str(e)}")
\ No newline at end of file
+            self.error.emit(f"Unexpected error: {str(e)}")
@@ -0,0 +1,84 @@
+import numpy as np
+from src.utils import metrics
+from src.utils.subtitles import format_timestamp, parse_timestamp
+from src.processing.audio_stream import SAMPLE_RATE
+
+FRAME = 0.02
+THRESHOLD_DB = -40.0
+MIN_SILENCE = 0.6
+PADDING = 0.15
+CHUNK_FRAMES = 30000
+
+def frame_rms(samples, frame=FRAME):
+    # int16 PCM in, one RMS value per frame out; chunked so an hour of audio stays a few MB at a time
+    frame_samples = int(frame * SAMPLE_RATE)
+    frames = len(samples) // frame_samples
+    rms = np.empty(frames, dtype=np.float32)
+    for first in range(0, frames, CHUNK_FRAMES):
+        last = min(first + CHUNK_FRAMES, frames)
+        block = np.asarray(samples[first * frame_samples:last * frame_samples], dtype=np.float32)
+        block = block.reshape(last - first, frame_samples) / 32768.0
+        rms[first:last] = np.sqrt(np.einsum('ij,ij->i', block, block) / frame_samples)
+    return rms
+
+def find_silences(rms, frame=FRAME, threshold_db=THRESHOLD_DB, min_silence=MIN_SILENCE):
+    silent = rms < 10 ** (threshold_db / 20)
+    edges = np.diff(np.concatenate([[0], silent.astype(np.int8), [0]]))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    long_enough = (ends - starts) * frame >= min_silence
+    return np.stack([starts[long_enough], ends[long_enough]], axis=1) * frame
+
+def keep_segments(silences, duration, padding=PADDING):
+    # Silences shrink by padding on both sides so cuts don't clip the edges of words
+    segments = []
+    position = 0.0
+    for start, end in silences:
+        cut_start = 0.0 if start <= 0 else start + padding
+        cut_end = duration if end >= duration else end - padding
+        if cut_end <= cut_start:
+            continue
+        if cut_start > position:
+            segments.append((position, cut_start))
+        position = cut_end
+    if position < duration:
+        segments.append((position, duration))
+    return segments
+
+def detect_segments(samples, duration, threshold_db=THRESHOLD_DB, min_silence=MIN_SILENCE, padding=PADDING):
+    with metrics.stage('silence', seconds=round(duration, 1)) as record:
+        silences = find_silences(frame_rms(samples), threshold_db=threshold_db, min_silence=min_silence)
+        segments = keep_segments(silences.tolist(), duration, padding)
+        record['cuts'] = len(silences)
+        record['kept_s'] = round(sum(end - start for start, end in segments), 3)
+    return segments
+
+def select_expression(segments):
+    return '+'.join(f"between(t,{start:.3f},{end:.3f})" for start, end in segments)
+
+def cut_filters(segments):
+    # Frames outside the kept segments are dropped and timestamps re-packed, in the same graph as the render
+    expression = select_expression(segments)
+    return f"select='{expression}',setpts=N/FRAME_RATE/TB", f"aselect='{expression}',asetpts=N/SR/TB"
+
+def remap_time(seconds, segments):
+    removed = 0.0
+    previous_end = 0.0
+    for start, end in segments:
+        removed += start - previous_end
+        if seconds < start:
+            return start - removed
+        if seconds <= end:
+            return seconds - removed
+        previous_end = end
+    return previous_end - removed
+
+def remap_subtitles(subtitles, segments):
+    remapped = []
+    for start, end, text in subtitles:
+        new_start = remap_time(parse_timestamp(start), segments)
+        new_end = remap_time(parse_timestamp(end), segments)
+        # A cue that sat entirely inside a removed silence collapses to nothing
+        if new_end - new_start > 0.05:
+            remapped.append((format_timestamp(new_start), format_timestamp(new_end), text))
+    return remapped
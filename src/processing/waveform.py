@@ -0,0 +1,101 @@
+import numpy as np
+from PyQt6.QtCore import QThread, pyqtSignal
+from src.utils import metrics
+from src.utils.artifact_store import store, file_hash
+from src.processing.audio_stream import SAMPLE_RATE, iter_pipe_windows
+
+# Level 0 holds one min/max pair per SAMPLES_PER_PEAK samples (250 per second); each further
+# level merges LEVEL_FACTOR pairs of the one below until a level fits in MIN_PEAKS
+SAMPLES_PER_PEAK = 64
+LEVEL_FACTOR = 4
+MIN_PEAKS = 512
+DECODE_WINDOW = 60
+
+def level_lengths(first):
+    lengths = [first]
+    while lengths[-1] > MIN_PEAKS:
+        lengths.append(-(-lengths[-1] // LEVEL_FACTOR))
+    return lengths
+
+def _reduce(peaks, factor):
+    pad = -len(peaks) % factor
+    if pad:
+        peaks = np.concatenate([peaks, np.repeat(peaks[-1:], pad, axis=0)])
+    blocks = peaks.reshape(-1, factor, 2)
+    return np.stack([blocks[:, :, 0].min(axis=1), blocks[:, :, 1].max(axis=1)], axis=1)
+
+def compute_peaks(video_path):
+    chunks = []
+    with metrics.stage('waveform') as record:
+        # Decoded window by window so an hour of audio never sits in memory at once
+        for _, samples, _ in iter_pipe_windows(video_path, DECODE_WINDOW, 0):
+            pad = -len(samples) % SAMPLES_PER_PEAK
+            if pad:
+                samples = np.concatenate([samples, np.zeros(pad, dtype=np.float32)])
+            blocks = samples.reshape(-1, SAMPLES_PER_PEAK)
+            chunks.append(np.stack([blocks.min(axis=1), blocks.max(axis=1)], axis=1))
+        levels = [np.concatenate(chunks) if chunks else np.zeros((1, 2), dtype=np.float32)]
+        while len(levels[-1]) > MIN_PEAKS:
+            levels.append(_reduce(levels[-1], LEVEL_FACTOR))
+        record['levels'] = len(levels)
+        record['peaks'] = len(levels[0])
+    # Row 0 is a header: level 0 length and samples per peak; the levels follow back to back
+    header = np.array([[len(levels[0]), SAMPLES_PER_PEAK]], dtype=np.float32)
+    return np.concatenate([header] + levels).astype(np.float32)
+
+class WaveformPeaks:
+    def __init__(self, data):
+        self.data = data
+        first, samples_per_peak = int(data[0, 0]), int(data[0, 1])
+        self.rate = SAMPLE_RATE / samples_per_peak
+        self.levels = []
+        offset = 1
+        for length in level_lengths(first):
+            self.levels.append(data[offset:offset + length])
+            offset += length
+
+    def level_for(self, pixels_per_second):
+        # Coarsest level that still has at least one peak per pixel column
+        for index in range(len(self.levels) - 1, -1, -1):
+            if self.rate / LEVEL_FACTOR ** index >= pixels_per_second:
+                return index
+        return 0
+
+    def columns(self, start, pixels_per_second, width):
+        index = self.level_for(pixels_per_second)
+        level = self.levels[index]
+        rate = self.rate / LEVEL_FACTOR ** index
+        times = start + np.arange(width + 1) / pixels_per_second
+        bounds = np.clip((times * rate).astype(np.int64), 0, len(level))
+        valid = bounds[:-1] < len(level)
+        mins = np.zeros(width, dtype=np.float32)
+        maxs = np.zeros(width, dtype=np.float32)
+        if valid.any():
+            starts = bounds[:-1][valid]
+            # Each column reduces only the few peaks between its bounds, so cost per column is constant
+            segment = level[:max(bounds[np.flatnonzero(valid)[-1] + 1], starts[-1] + 1)]
+            mins[valid] = np.minimum.reduceat(segment[:, 0], starts)
+            maxs[valid] = np.maximum.reduceat(segment[:, 1], starts)
+        return mins, maxs
+
+def load_waveform(video_path):
+    def build(tmp_path):
+        with open(tmp_path, 'wb') as f:
+            np.save(f, compute_peaks(video_path))
+
+    path = store.produce(store.key('waveform', file_hash(video_path), SAMPLES_PER_PEAK, LEVEL_FACTOR), '.npy', build)
+    return WaveformPeaks(np.load(path, mmap_mode='r'))
+
+class WaveformThread(QThread):
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+    def __init__(self, video_path):
+        super().__init__()
+        self.video_path = video_path
+
+    def run(self):
+        try:
+            self.finished.emit(load_waveform(self.video_path))
+        except Exception as e:
+            self.error.emit(str(e))
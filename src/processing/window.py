@@ -0,0 +1,60 @@
+import numpy as np
+from src.utils import metrics
+from src.utils.subtitles import parse_timestamp
+from src.processing.audio_stream import iter_pipe_windows
+
+# Extra audio decoded on each side so Whisper has context for words crossing the cut
+MARGIN = 1.0
+ANALYSIS_RATE = 4000
+ANALYSIS_CHUNK = 60
+
+def parse_start(value):
+    if value in (None, ''):
+        return 0.0
+    if isinstance(value, str) and value.strip().lower() == 'auto':
+        return 'auto'
+    start = parse_timestamp(value) if isinstance(value, str) else float(value)
+    if start < 0:
+        raise ValueError(f"Start must not be negative: {value}")
+    return start
+
+def loudest_start(video_path, length):
+    with metrics.stage('window_analysis') as record:
+        # Decoded a minute at a time and reduced to one RMS value per second, so memory stays flat
+        blocks = []
+        for _, samples, _ in iter_pipe_windows(video_path, ANALYSIS_CHUNK, 0, rate=ANALYSIS_RATE):
+            seconds = len(samples) // ANALYSIS_RATE
+            block = samples[:seconds * ANALYSIS_RATE].reshape(seconds, ANALYSIS_RATE)
+            blocks.append(np.sqrt(np.einsum('ij,ij->i', block, block) / ANALYSIS_RATE))
+        rms = np.concatenate(blocks) if blocks else np.zeros(0, dtype=np.float32)
+        window = int(length)
+        if len(rms) <= window:
+            return 0.0
+        totals = np.cumsum(np.concatenate([[0.0], rms]))
+        start = float(np.argmax(totals[window:] - totals[:-window]))
+        record['start'] = start
+    return start
+
+def plan_window(video_path, length, start=0.0, source_duration=None):
+    if start == 'auto':
+        start = loudest_start(video_path, length)
+    if source_duration:
+        start = min(float(start), max(0.0, source_duration - length))
+        length = min(length, source_duration - start)
+    return start, length
+
+def extraction_range(start, length, margin=MARGIN):
+    extract_start = max(0.0, start - margin)
+    return extract_start, start + length + margin - extract_start
+
+def rebase_segment(segment, start, length, extract_start):
+    # ASR times are relative to the extracted audio and the render seeks to start; words outside the window are dropped
+    offset = start - extract_start
+    if segment['end'] <= offset or segment['start'] >= offset + length:
+        return None
+    rebased = {'start': max(segment['start'], offset) - offset, 'end': min(segment['end'], offset + length) - offset,
+               'text': segment['text']}
+    if 'words' in segment:
+        rebased['words'] = [{**word, 'start': word['start'] - offset, 'end': word['end'] - offset}
+                            for word in segment['words'] if word['start'] >= offset and word['end'] <= offset + length]
+    return rebased
@@ -1,5 +1,6 @@
-from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLabel, QComboBox, QPushButton
-from src.processing.export_thread import ExportThread
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QPushButton, QCheckBox, QMessageBox
+from src.processing.export_thread import ExportThread, RESOLUTIONS, PROFILES
+from src.utils import metrics
 
 class ExportDialog(QDialog):
     def __init__(self, parent=None):
@@ -7,6 +8,7 @@ class ExportDialog(QDialog):
         self.parent = parent
         self.setWindowTitle("Export Video")
         self.setStyleSheet("background-color: #3d3d3d; color: white;")
+        self.output_labels = {}
         self.init_ui()
 
     def init_ui(self):
@@ -14,11 +16,26 @@ class ExportDialog(QDialog):
 
         resolution_label = QLabel("Resolution")
         resolution_label.setStyleSheet("font-weight: bold;")
-        self.resolution_combo = QComboBox()
-        self.resolution_combo.addItems(['720p', '1080p', '2K', '4K'])
-        self.resolution_combo.setStyleSheet("background-color: #4d4d4d; padding: 5px; border-radius: 5px;")
         layout.addWidget(resolution_label)
-        layout.addWidget(self.resolution_combo)
+        resolution_layout = QHBoxLayout()
+        self.resolution_checks = {}
+        for resolution in RESOLUTIONS:
+            check = QCheckBox(resolution)
+            check.setChecked(resolution == '720p')
+            resolution_layout.addWidget(check)
+            self.resolution_checks[resolution] = check
+        layout.addLayout(resolution_layout)
+
+        profile_label = QLabel("Encoding Profile")
+        profile_label.setStyleSheet("font-weight: bold; margin-top: 10px;")
+        self.profile_combo = QComboBox()
+        self.profile_combo.addItems(list(PROFILES))
+        self.profile_combo.setStyleSheet("background-color: #4d4d4d; padding: 5px; border-radius: 5px;")
+        layout.addWidget(profile_label)
+        layout.addWidget(self.profile_combo)
+
+        self.progress_layout = QVBoxLayout()
+        layout.addLayout(self.progress_layout)
 
         export_btn = QPushButton("Export")
         export_btn.setStyleSheet("background-color: #22c55e; padding: 10px; border-radius: 5px; margin-top: 10px;")
@@ -26,14 +43,34 @@ class ExportDialog(QDialog):
         layout.addWidget(export_btn)
 
     def export_video(self):
-        resolution = self.resolution_combo.currentText()
-        output_path = f"output/final-{resolution}.mp4"
+        resolutions = [r for r, check in self.resolution_checks.items() if check.isChecked()]
+        if not resolutions:
+            QMessageBox.warning(self, "Error", "Please select at least one resolution")
+            return
+        output_path = "output/final-{resolution}.mp4"
+
+        for label in self.output_labels.values():
+            label.deleteLater()
+        self.output_labels = {}
+        for resolution in resolutions:
+            label = QLabel(f"{resolution}: 0%")
+            label.setStyleSheet("font-size: 12px; color: #aaaaaa;")
+            self.progress_layout.addWidget(label)
+            self.output_labels[output_path.format(resolution=resolution)] = label
 
         self.parent.progress_bar.setVisible(True)
         self.parent.progress_bar.setValue(0)
+        self.parent.job = metrics.start_job('export')
 
-        self.export_thread = ExportThread(self.parent.processed_path, output_path, resolution)
+        self.export_thread = ExportThread(self.parent.processed_path, output_path, resolutions, [self.profile_combo.currentText()])
         self.export_thread.progress.connect(self.parent.update_progress)
+        self.export_thread.output_progress.connect(self.update_output_progress)
         self.export_thread.finished.connect(lambda path: self.parent.export_finished(path, self))
         self.export_thread.error.connect(self.parent.show_error)
-        self.export_thread.start()
\ No newline at end of file
+        self.export_thread.start()
+
+    def update_output_progress(self, path, value):
+        label = self.output_labels.get(path)
+        if label:
+            resolution = path.rsplit('final-', 1)[-1].rsplit('.', 1)[0]
+            label.setText(f"{resolution}: {value}%")
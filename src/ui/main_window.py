@@ -3,7 +3,7 @@ from datetime import datetime, timedelta
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QLabel, QLineEdit, QPushButton, QComboBox, QProgressBar,
                              QMessageBox, QFrame, QTableWidget, QTableWidgetItem, QHeaderView,
-                             QFileDialog, QColorDialog)
+                             QFileDialog, QColorDialog, QCheckBox)
 from PyQt6.QtMultimediaWidgets import QVideoWidget
 from PyQt6.QtCore import Qt, QUrl
 from PyQt6.QtMultimedia import QMediaPlayer
@@ -11,9 +11,19 @@ from PyQt6.QtGui import QPixmap
 from src.ui.subtitle_dialog import SubtitleDialog
 from src.ui.export_dialog import ExportDialog
 from src.ui.license_dialog import LicenseDialog
-from src.processing.process_thread import ProcessThread
-from src.processing.ai_processor import generate_subtitles, translate_subtitles
+from src.ui.stage_timeline import StageTimeline
+from src.ui.timeline import TimelineWidget
+from src.processing.filmstrip import FilmstripThread
+from src.processing.waveform import WaveformThread
+from src.processing.pipeline_thread import PipelineThread
+from src.processing.asr import ASR_BACKEND, BACKENDS
+from src.processing.daemon_thread import DaemonJobThread
+from src.daemon.client import DaemonClient
 from src.utils.youtube_downloader import download_youtube_video
+from src.utils import metrics
+from src.utils.artifact_store import store
+from src.utils.media_probe import try_probe
+from src.utils.subtitles import parse_time_ranges
 
 TRIAL_DAYS = 7
 TRIAL_START_FILE = "trial_start.txt"
@@ -27,11 +37,15 @@ class VideoEditor(QMainWindow):
         self.setStyleSheet("background-color: #2d2d2d; color: white;")
         self.video_path = None
         self.processed_path = None
+        self.pinned_paths = []
         self.subtitles = []
         self.is_modified = False
         self.current_ratio = '16:9'
         self.current_language = 'English'
         self.current_duration = 'Auto'
+        self.job = None
+        self.media_info = None
+        self.daemon = DaemonClient() if os.environ.get('APPCUTSHORT_DAEMON') else None
         self.is_trial_active = self.check_trial_period()
         self.is_licensed = self.check_license()
         self.init_ui()
@@ -74,6 +88,7 @@ class VideoEditor(QMainWindow):
         self.video_widget.setStyleSheet("background-color: black;")
         self.player = QMediaPlayer()
         self.player.setVideoOutput(self.video_widget)
+        self.player.positionChanged.connect(lambda ms: self.timeline.set_position(ms / 1000))
         preview_layout.addWidget(self.video_widget)
         self.preview_label = QLabel("No video loaded\nClick to browse or drag & drop video")
         self.preview_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -131,6 +146,15 @@ class VideoEditor(QMainWindow):
         edit_layout.addWidget(language_label)
         edit_layout.addWidget(self.language_combo)
 
+        asr_label = QLabel("Speech Engine")
+        asr_label.setStyleSheet("font-weight: bold; margin-top: 10px;")
+        self.asr_combo = QComboBox()
+        self.asr_combo.addItems(list(BACKENDS))
+        self.asr_combo.setCurrentText(ASR_BACKEND)
+        self.asr_combo.setStyleSheet("background-color: #4d4d4d; padding: 5px; border-radius: 5px;")
+        edit_layout.addWidget(asr_label)
+        edit_layout.addWidget(self.asr_combo)
+
         duration_label = QLabel("Video Duration")
         duration_label.setStyleSheet("font-weight: bold; margin-top: 10px;")
         self.duration_combo = QComboBox()
@@ -140,6 +164,24 @@ class VideoEditor(QMainWindow):
         edit_layout.addWidget(duration_label)
         edit_layout.addWidget(self.duration_combo)
 
+        start_label = QLabel("Start")
+        start_label.setStyleSheet("font-weight: bold; margin-top: 10px;")
+        self.start_input = QLineEdit()
+        self.start_input.setPlaceholderText("00:00, or auto for the liveliest part")
+        self.start_input.setStyleSheet("background-color: #4d4d4d; padding: 5px; border-radius: 5px;")
+        edit_layout.addWidget(start_label)
+        edit_layout.addWidget(self.start_input)
+        self.jump_cut_check = QCheckBox("Remove silence")
+        edit_layout.addWidget(self.jump_cut_check)
+
+        clips_label = QLabel("Clips")
+        clips_label.setStyleSheet("font-weight: bold; margin-top: 10px;")
+        self.clips_input = QLineEdit()
+        self.clips_input.setPlaceholderText("00:30-01:30, 05:00-06:00 (optional)")
+        self.clips_input.setStyleSheet("background-color: #4d4d4d; padding: 5px; border-radius: 5px;")
+        edit_layout.addWidget(clips_label)
+        edit_layout.addWidget(self.clips_input)
+
         font_label = QLabel("Font")
         font_label.setStyleSheet("font-weight: bold; margin-top: 10px;")
         self.font_combo = QComboBox()
@@ -167,8 +209,11 @@ class VideoEditor(QMainWindow):
 
         timeline_area = QFrame()
         timeline_area.setStyleSheet("background-color: #3d3d3d; border-radius: 10px;")
-        timeline_area.setFixedHeight(150)
+        timeline_area.setFixedHeight(240)
         timeline_layout = QVBoxLayout(timeline_area)
+        self.timeline = TimelineWidget()
+        self.timeline.seek.connect(lambda seconds: self.player.setPosition(int(seconds * 1000)))
+        timeline_layout.addWidget(self.timeline)
         self.subtitle_table = QTableWidget()
         self.subtitle_table.setStyleSheet("background-color: #4d4d4d; border: none;")
         self.subtitle_table.setColumnCount(3)
@@ -184,10 +229,18 @@ class VideoEditor(QMainWindow):
         self.progress_bar.setVisible(False)
         main_layout.addWidget(self.progress_bar)
 
+        self.stage_timeline = StageTimeline()
+        self.stage_timeline.setVisible(False)
+        main_layout.addWidget(self.stage_timeline)
+
         self.status_label = QLabel(self.get_status_text())
         self.status_label.setStyleSheet("font-size: 12px; color: #aaaaaa;")
         main_layout.addWidget(self.status_label)
 
+        self.media_info_label = QLabel("")
+        self.media_info_label.setStyleSheet("font-size: 12px; color: #aaaaaa;")
+        main_layout.addWidget(self.media_info_label)
+
     def load_thumbnail(self, url):
         if self.enforce_trial_restrictions():
             return
@@ -209,7 +262,9 @@ class VideoEditor(QMainWindow):
         if not url:
             QMessageBox.warning(self, "Error", "Please enter a YouTube URL")
             return
+        job = metrics.start_job('download')
         self.video_path = download_youtube_video(url)
+        job.finish('ok' if self.video_path else 'error')
         if self.video_path:
             self.load_video_to_player(self.video_path)
             self.thumbnail_label.setVisible(False)
@@ -280,10 +335,43 @@ class VideoEditor(QMainWindow):
                 self.preview_label.hide()
                 self.thumbnail_label.setVisible(False)
 
+    def pin_artifacts(self):
+        # Keep the cache from evicting the source or render the editor is showing
+        for path in self.pinned_paths:
+            store.unpin(path)
+        self.pinned_paths = [path for path in (self.video_path, self.processed_path) if path]
+        for path in self.pinned_paths:
+            store.pin(path)
+
     def load_video_to_player(self, video_path):
+        self.pin_artifacts()
+        self.media_info = try_probe(video_path)
+        self.media_info_label.setText(self.media_info.summary() if self.media_info else "")
         self.player.setSource(QUrl.fromLocalFile(video_path))
         self.player.play()
         self.update_preview_size()
+        self.load_timeline(video_path)
+
+    def load_timeline(self, video_path):
+        self.timeline.clear()
+        if not self.media_info:
+            return
+        duration = self.media_info.duration
+        self.timeline_path = video_path
+        if self.media_info.audio:
+            self.waveform_thread = WaveformThread(video_path)
+            self.waveform_thread.setParent(self)
+            self.waveform_thread.finished.connect(
+                lambda peaks: self.timeline.set_waveform(peaks, duration) if self.timeline_path == video_path else None)
+            self.waveform_thread.start()
+        if not self.media_info.video:
+            return
+        self.filmstrip_thread = FilmstripThread(video_path)
+        # Parented so a still-running strip for the previous video isn't destroyed when replaced
+        self.filmstrip_thread.setParent(self)
+        self.filmstrip_thread.finished.connect(
+            lambda atlas: self.timeline.set_filmstrip(atlas, duration) if self.timeline_path == video_path else None)
+        self.filmstrip_thread.start()
 
     def select_ratio(self, ratio):
         if self.enforce_trial_restrictions():
@@ -336,35 +424,92 @@ class VideoEditor(QMainWindow):
         color = self.color_btn.styleSheet().split('background-color: ')[1].split(';')[0]
         language = self.current_language
         duration = self.current_duration
-        output_path = os.path.join('temp', 'processed.mp4')
-        self.subtitles = generate_subtitles(self.video_path, language)
+        try:
+            ranges = parse_time_ranges(self.clips_input.text())
+        except ValueError as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+        spec = {
+            'source': os.path.abspath(self.video_path),
+            'ratio': aspect_ratio,
+            'language': language,
+            'duration': duration,
+            'font': font,
+            'color': color,
+            'clips': self.clips_input.text() if ranges else '',
+            'start': self.start_input.text().strip(),
+            'jump_cut': self.jump_cut_check.isChecked(),
+            'asr_backend': self.asr_combo.currentText(),
+        }
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setValue(0)
+        self.stage_timeline.reset()
+        self.stage_timeline.setVisible(True)
+        if self.daemon:
+            # The availability probe runs on the job thread; an unreachable daemon falls back to a local render
+            thread = DaemonJobThread(self.daemon, spec)
+            thread.unavailable.connect(lambda: self.start_process_thread(self.local_pipeline(spec, ranges), ranges))
+            self.start_process_thread(thread, ranges)
+        else:
+            self.start_process_thread(self.local_pipeline(spec, ranges), ranges)
+
+    def local_pipeline(self, spec, ranges):
+        # Shorts from a clip list are deliverables; a single render stays in the artifact store
+        return PipelineThread(spec, 'output' if ranges else None)
+
+    def start_process_thread(self, thread, ranges):
+        self.process_thread = thread
+        self.process_thread.progress.connect(self.update_progress)
+        self.process_thread.stage_event.connect(self.stage_timeline.stage_event)
+        self.process_thread.subtitles.connect(self.pipeline_subtitles)
+        self.process_thread.finished.connect(self.clips_finished if ranges else self.process_finished)
+        self.process_thread.error.connect(self.show_error)
+        self.process_thread.start()
+
+    def pipeline_subtitles(self, subtitles):
+        self.subtitles = subtitles
+        self.show_subtitles(subtitles)
+
+    def show_subtitles(self, subtitles):
         self.subtitle_table.setRowCount(0)
-        for start, end, text in self.subtitles:
+        for start, end, text in subtitles:
             row = self.subtitle_table.rowCount()
             self.subtitle_table.setRowCount(row + 1)
             self.subtitle_table.setItem(row, 0, QTableWidgetItem(start))
             self.subtitle_table.setItem(row, 1, QTableWidgetItem(end))
             self.subtitle_table.setItem(row, 2, QTableWidgetItem(text))
-        self.progress_bar.setVisible(True)
-        self.progress_bar.setValue(0)
-        self.process_thread = ProcessThread(self.video_path, output_path, aspect_ratio, font, color, self.subtitles, language, duration)
-        self.process_thread.progress.connect(self.update_progress)
-        self.process_thread.finished.connect(self.process_finished)
-        self.process_thread.error.connect(self.show_error)
-        self.process_thread.start()
+
+    def clips_finished(self, output_paths):
+        self.progress_bar.setVisible(False)
+        self.stage_timeline.stop()
+        self.finish_job()
+        paths = output_paths.splitlines()
+        self.processed_path = paths[0]
+        self.load_video_to_player(self.processed_path)
+        self.is_modified = False
+        QMessageBox.information(self, "Success", f"{len(paths)} clips processed:\n{output_paths}")
 
     def update_progress(self, value):
         self.progress_bar.setValue(value)
 
     def process_finished(self, output_path):
         self.progress_bar.setVisible(False)
+        self.stage_timeline.stop()
+        self.finish_job()
         self.processed_path = output_path
         self.load_video_to_player(self.processed_path)
         self.is_modified = False
         QMessageBox.information(self, "Success", "Video processed successfully")
 
+    def finish_job(self, status='ok'):
+        if self.job:
+            self.job.finish(status)
+            self.job = None
+
     def show_error(self, message):
         self.progress_bar.setVisible(False)
+        self.stage_timeline.stop()
+        self.finish_job('error')
         QMessageBox.critical(self, "Error", message)
 
     def show_export_dialog(self):
@@ -378,6 +523,7 @@ class VideoEditor(QMainWindow):
 
     def export_finished(self, output_path, dialog):
         self.progress_bar.setVisible(False)
+        self.finish_job()
         dialog.close()
         self.is_modified = False
         QMessageBox.information(self, "Success", f"Video exported successfully at: {output_path}")
@@ -0,0 +1,51 @@
+import time
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import Qt, QTimer, QRectF
+from PyQt6.QtGui import QPainter, QColor
+
+STATUS_COLORS = {'running': '#3b82f6', 'done': '#22c55e', 'error': '#ef4444', 'skipped': '#6b7280'}
+
+class StageTimeline(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.stages = {}
+        self.started = None
+        self.setMinimumHeight(24)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.update)
+
+    def reset(self):
+        self.stages = {}
+        self.started = time.perf_counter()
+        self.setFixedHeight(24)
+        self.timer.start(200)
+        self.update()
+
+    def stage_event(self, name, status, elapsed):
+        start, _, _ = self.stages.get(name, (elapsed, None, None))
+        self.stages[name] = (start, elapsed if status != 'running' else None, status)
+        self.setFixedHeight(max(24, 18 * len(self.stages) + 6))
+        self.update()
+
+    def stop(self):
+        self.timer.stop()
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor('#3d3d3d'))
+        if not self.stages:
+            return
+        now = time.perf_counter() - self.started if self.started else 0
+        total = max([now] + [end or now for _, end, _ in self.stages.values()]) or 1
+        label_width = 80
+        width = self.width() - label_width - 10
+        for row, (name, (start, end, status)) in enumerate(self.stages.items()):
+            y = 4 + row * 18
+            painter.setPen(QColor('#aaaaaa'))
+            painter.drawText(QRectF(4, y, label_width - 8, 14), Qt.AlignmentFlag.AlignVCenter, name)
+            finish = end if end is not None else now
+            x = label_width + width * start / total
+            bar = max(2, width * (finish - start) / total)
+            painter.fillRect(QRectF(x, y + 2, bar, 10), QColor(STATUS_COLORS.get(status, '#aaaaaa')))
+            painter.drawText(QRectF(x + bar + 4, y, 60, 14), Qt.AlignmentFlag.AlignVCenter, f"{finish - start:.1f}s")
@@ -0,0 +1,115 @@
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import Qt, QRectF, QLineF, pyqtSignal
+from PyQt6.QtGui import QPainter, QColor, QImage
+
+class TimelineWidget(QWidget):
+    seek = pyqtSignal(float)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.duration = 0.0
+        self.position = 0.0
+        self.offset = 0.0
+        self.pixels_per_second = 0.0
+        self.frames = []
+        self.waveform = None
+        self.setMinimumHeight(120)
+
+    def set_filmstrip(self, atlas, duration):
+        # QImages are built once; zooming and scrolling only pick which ones to draw
+        self.atlas = atlas
+        self.frames = [QImage(frame.data, frame.shape[1], frame.shape[0], frame.strides[0], QImage.Format.Format_RGB888)
+                       for frame in atlas]
+        self.set_duration(duration)
+        self.update()
+
+    def set_waveform(self, waveform, duration):
+        self.waveform = waveform
+        self.set_duration(duration)
+        self.update()
+
+    def set_duration(self, duration):
+        # The filmstrip and the waveform arrive separately; only the first one resets the view
+        if self.duration:
+            return
+        self.duration = duration
+        self.offset = 0.0
+        self.pixels_per_second = self.width() / duration if duration else 0.0
+
+    def clear(self):
+        self.frames = []
+        self.waveform = None
+        self.duration = 0.0
+        self.update()
+
+    def set_position(self, seconds):
+        self.position = seconds
+        self.update()
+
+    def min_zoom(self):
+        return self.width() / self.duration if self.duration else 0.0
+
+    def time_at(self, x):
+        return self.offset + x / self.pixels_per_second if self.pixels_per_second else 0.0
+
+    def clamp_offset(self):
+        visible = self.width() / self.pixels_per_second if self.pixels_per_second else 0.0
+        self.offset = min(max(0.0, self.offset), max(0.0, self.duration - visible))
+
+    def wheelEvent(self, event):
+        if not self.duration:
+            return
+        delta = event.angleDelta().y() / 120
+        if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            # Zoom around the cursor so the frame under it stays put
+            x = event.position().x()
+            anchor = self.time_at(x)
+            self.pixels_per_second = min(max(self.min_zoom(), self.pixels_per_second * 1.25 ** delta), 400.0)
+            self.offset = anchor - x / self.pixels_per_second
+        else:
+            self.offset -= delta * 80 / self.pixels_per_second
+        self.clamp_offset()
+        self.update()
+
+    def mousePressEvent(self, event):
+        if self.duration and event.button() == Qt.MouseButton.LeftButton:
+            self.seek.emit(min(max(0.0, self.time_at(event.position().x())), self.duration))
+
+    def resizeEvent(self, event):
+        if self.duration:
+            self.pixels_per_second = max(self.pixels_per_second, self.min_zoom())
+            self.clamp_offset()
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor('#2d2d2d'))
+        if not self.pixels_per_second:
+            return
+        strip_height = (self.height() - 12) * 3 // 5 if self.waveform else self.height() - 8
+        if self.frames:
+            self.paint_filmstrip(painter, strip_height)
+        if self.waveform:
+            self.paint_waveform(painter, QRectF(0, strip_height + 8, self.width(), self.height() - strip_height - 12))
+        playhead = (self.position - self.offset) * self.pixels_per_second
+        painter.fillRect(QRectF(playhead - 1, 0, 2, self.height()), QColor('#ef4444'))
+
+    def paint_filmstrip(self, painter, strip_height):
+        frame = self.frames[0]
+        tile_width = max(1, round(frame.width() * strip_height / frame.height()))
+        # Each tile shows the thumbnail nearest its own time, so the strip stays dense at any zoom
+        x = -((self.offset * self.pixels_per_second) % tile_width)
+        while x < self.width():
+            seconds = self.time_at(x + tile_width / 2)
+            if 0 <= seconds < self.duration:
+                index = min(int(seconds / self.duration * len(self.frames)), len(self.frames) - 1)
+                painter.drawImage(QRectF(x, 4, tile_width, strip_height), self.frames[index])
+            x += tile_width
+
+    def paint_waveform(self, painter, rect):
+        mins, maxs = self.waveform.columns(self.offset, self.pixels_per_second, int(rect.width()))
+        middle = rect.center().y()
+        scale = rect.height() / 2
+        painter.setPen(QColor('#60a5fa'))
+        painter.drawLines([QLineF(x, middle - high * scale, x, middle - low * scale)
+                           for x, (low, high) in enumerate(zip(mins.tolist(), maxs.tolist()))])
@@ -0,0 +1,223 @@
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+from src.utils import metrics
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Downloads and derived artifacts live under CACHE_DIR, named by the hash of what produced them.
+# The directory is kept under CACHE_QUOTA_MB by evicting the least recently used unpinned files.
+# Pins are mirrored as '<artifact>.pin-<pid>' markers so the daemon and the GUI respect each other's.
+CACHE_DIR = os.environ.get('APPCUTSHORT_CACHE_DIR', os.path.join('temp', 'cache'))
+CACHE_QUOTA_MB = int(os.environ.get('APPCUTSHORT_CACHE_QUOTA_MB', 10240))
+HASH_CHUNK = 1 << 20
+# Partial builds ('.tmp' files and yt-dlp's '.part' next to them) are kept so a retry can resume;
+# ones nobody has touched for this long are abandoned and removed
+PARTIAL_TTL = 24 * 3600
+
+_file_hashes = {}
+_file_hashes_lock = threading.Lock()
+
+def file_hash(path):
+    # Size plus head, middle and tail chunks: cheap enough for multi-GB sources and stable across renames
+    stat = os.stat(path)
+    cache_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _file_hashes_lock:
+        if cache_key in _file_hashes:
+            return _file_hashes[cache_key]
+    digest = hashlib.sha256(str(stat.st_size).encode())
+    with open(path, 'rb') as f:
+        for offset in sorted({0, max(0, stat.st_size // 2 - HASH_CHUNK // 2), max(0, stat.st_size - HASH_CHUNK)}):
+            f.seek(offset)
+            digest.update(f.read(HASH_CHUNK))
+    value = digest.hexdigest()
+    with _file_hashes_lock:
+        _file_hashes[cache_key] = value
+    return value
+
+def _process_alive(pid):
+    if psutil:
+        return psutil.pid_exists(pid)
+    if os.name != 'posix':
+        # os.kill would terminate the process on Windows; keep the marker
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class ArtifactStore:
+    def __init__(self, root=CACHE_DIR, quota_mb=CACHE_QUOTA_MB):
+        self.root = root
+        self.quota = quota_mb * 1024 * 1024
+        self._pins = {}
+        self._building = {}
+        self._lock = threading.Lock()
+
+    def key(self, kind, *parts, **params):
+        payload = json.dumps([kind, parts, params], sort_keys=True, default=str)
+        return f"{kind}-{hashlib.sha256(payload.encode()).hexdigest()[:32]}"
+
+    def path(self, key, suffix=''):
+        return os.path.join(self.root, key[-2:], key + suffix)
+
+    def get(self, key, suffix=''):
+        path = self.path(key, suffix)
+        try:
+            # mtime doubles as the LRU clock, which every process sharing the directory sees
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def produce(self, key, suffix, build, pin=False):
+        # build(tmp_path) writes the artifact; concurrent callers for the same key wait for one build.
+        # With pin=True the artifact stays pinned for the caller, who must unpin() it when done.
+        with self._lock:
+            building = self._building.setdefault(key, threading.Lock())
+        with building:
+            path = self.get(key, suffix)
+            with metrics.stage('artifact', kind=key.split('-', 1)[0]) as record:
+                record['hit'] = path is not None
+                if path is None:
+                    path = self.path(key, suffix)
+                    tmp_path = self.path(key, '.tmp' + suffix)
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    try:
+                        build(tmp_path)
+                        os.replace(tmp_path, path)
+                    finally:
+                        if os.path.exists(tmp_path):
+                            os.remove(tmp_path)
+            self.pin(path)
+        try:
+            self.evict()
+        finally:
+            if not pin:
+                self.unpin(path)
+        return path
+
+    def pin(self, path):
+        if not path:
+            return
+        path = os.path.abspath(path)
+        with self._lock:
+            self._pins[path] = self._pins.get(path, 0) + 1
+            if self._pins[path] == 1 and self._in_store(path):
+                try:
+                    open(self._marker(path), 'w').close()
+                except OSError:
+                    pass
+
+    def unpin(self, path):
+        if not path:
+            return
+        path = os.path.abspath(path)
+        with self._lock:
+            count = self._pins.get(path, 0) - 1
+            if count > 0:
+                self._pins[path] = count
+            elif self._pins.pop(path, None) is not None and self._in_store(path):
+                with contextlib.suppress(OSError):
+                    os.remove(self._marker(path))
+
+    def _marker(self, path):
+        return f"{path}.pin-{os.getpid()}"
+
+    def _in_store(self, path):
+        # Sources outside the store are pinned in memory only; no markers next to user files
+        root = os.path.abspath(self.root)
+        try:
+            return os.path.commonpath([path, root]) == root
+        except ValueError:
+            return False
+
+    def _marked(self):
+        # Artifacts pinned by any live process; markers left by crashed processes are cleaned up
+        marked = set()
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if '.pin-' not in name:
+                    continue
+                target, _, pid = name.rpartition('.pin-')
+                if pid.isdigit() and _process_alive(int(pid)):
+                    marked.add(os.path.abspath(os.path.join(dirpath, target)))
+                else:
+                    with contextlib.suppress(OSError):
+                        os.remove(os.path.join(dirpath, name))
+        return marked
+
+    @contextlib.contextmanager
+    def pinned(self, *paths):
+        for path in paths:
+            self.pin(path)
+        try:
+            yield
+        finally:
+            for path in paths:
+                self.unpin(path)
+
+    def entries(self):
+        entries = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if '.pin-' in name:
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def usage(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        entries = []
+        expired = 0
+        stale = time.time() - PARTIAL_TTL
+        for mtime, size, path in self.entries():
+            if '.tmp' in os.path.basename(path) and mtime < stale:
+                with contextlib.suppress(OSError):
+                    os.remove(path)
+                    expired += 1
+                    continue
+            entries.append((mtime, size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        if expired:
+            metrics.emit({'event': 'artifact_expire', 'files': expired})
+        if total <= self.quota:
+            return 0
+        evicted = 0
+        with self._lock:
+            pinned = set(self._pins)
+        pinned |= self._marked()
+        for _, size, path in entries:
+            if total <= self.quota:
+                break
+            # Fresh partial builds count towards the quota but may still be written to or resumed
+            if os.path.abspath(path) in pinned or '.tmp' in os.path.basename(path):
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        if evicted:
+            metrics.emit({'event': 'artifact_evict', 'files': evicted, 'bytes_after': total})
+        return evicted
+
+store = ArtifactStore()
@@ -0,0 +1,76 @@
+import contextlib
+import os
+import threading
+
+# APPCUTSHORT_CPU_BUDGET caps the cores used by all jobs together; ML_SHARE is the part
+# reserved for torch while transcription/translation overlaps with ffmpeg encodes
+CPU_BUDGET = int(os.environ.get('APPCUTSHORT_CPU_BUDGET', 0)) or os.cpu_count() or 1
+ML_SHARE = float(os.environ.get('APPCUTSHORT_ML_SHARE', 0.5))
+
+class CpuBudget:
+    def __init__(self, cores=CPU_BUDGET, ml_share=ML_SHARE):
+        self.cores = max(1, cores)
+        self.ml_share = ml_share
+        self._active = {'ml': 0, 'encode': 0}
+        self._lock = threading.Lock()
+        self._interop_set = False
+
+    def threads(self, kind):
+        with self._lock:
+            active = dict(self._active)
+        active[kind] = max(active[kind], 1)
+        if active['ml'] and active['encode']:
+            ml_cores = min(max(1, round(self.cores * self.ml_share)), self.cores - 1) if self.cores > 1 else 1
+            pool = ml_cores if kind == 'ml' else max(1, self.cores - ml_cores)
+        else:
+            pool = self.cores
+        return max(1, pool // active[kind])
+
+    @contextlib.contextmanager
+    def stage(self, kind):
+        with self._lock:
+            self._active[kind] += 1
+        try:
+            threads = self.threads(kind)
+            if kind == 'ml':
+                self.apply_torch(threads)
+            yield threads
+        finally:
+            with self._lock:
+                self._active[kind] -= 1
+
+    def rebalance(self):
+        # Long ML stages call this between chunks so torch shrinks when encodes start alongside it
+        if self._active['ml']:
+            self.apply_torch(self.threads('ml'))
+
+    def apply_torch(self, threads):
+        try:
+            import torch
+        except ImportError:
+            return
+        torch.set_num_threads(threads)
+        if not self._interop_set:
+            self._interop_set = True
+            try:
+                torch.set_num_interop_threads(max(1, min(4, threads // 2)))
+            except RuntimeError:
+                # Only allowed before torch starts its first parallel region
+                pass
+
+budget = CpuBudget()
+
+def ml_stage():
+    return budget.stage('ml')
+
+def encode_stage():
+    return budget.stage('encode')
+
+def rebalance():
+    budget.rebalance()
+
+def ffmpeg_global_args(threads):
+    return ['-filter_threads', str(threads), '-filter_complex_threads', str(threads)]
+
+def ffmpeg_thread_args(threads):
+    return ['-threads', str(threads)]
@@ -0,0 +1,202 @@
+import json
+import os
+import re
+import subprocess
+import threading
+from dataclasses import dataclass, field
+from fractions import Fraction
+from typing import List, Optional
+
+_cache = {}
+_lock = threading.Lock()
+
+class ProbeError(RuntimeError):
+    pass
+
+@dataclass
+class StreamInfo:
+    index: int
+    codec_type: str
+    codec_name: str
+    width: int = 0
+    height: int = 0
+    fps: float = 0.0
+    pix_fmt: str = ''
+    sample_rate: int = 0
+    channels: int = 0
+    duration: float = 0.0
+    bit_rate: int = 0
+    rotation: int = 0
+
+@dataclass
+class MediaInfo:
+    path: str
+    duration: float
+    format_name: str
+    size: int
+    bit_rate: int
+    streams: List[StreamInfo] = field(default_factory=list)
+    _keyframes: Optional[List[float]] = field(default=None, repr=False)
+
+    @property
+    def video(self):
+        return next((s for s in self.streams if s.codec_type == 'video'), None)
+
+    @property
+    def audio(self):
+        return next((s for s in self.streams if s.codec_type == 'audio'), None)
+
+    @property
+    def has_audio(self):
+        return self.audio is not None
+
+    @property
+    def fps(self):
+        return self.video.fps if self.video else 0.0
+
+    @property
+    def rotation(self):
+        return self.video.rotation if self.video else 0
+
+    @property
+    def width(self):
+        if not self.video:
+            return 0
+        return self.video.height if self.rotation % 180 else self.video.width
+
+    @property
+    def height(self):
+        if not self.video:
+            return 0
+        return self.video.width if self.rotation % 180 else self.video.height
+
+    @property
+    def keyframes(self):
+        # Keyframe index needs a packet scan, so it is only run the first time it is asked for
+        if self._keyframes is None:
+            self._keyframes = _scan_keyframes(self.path)
+        return self._keyframes
+
+    @property
+    def keyframe_count(self):
+        return len(self.keyframes)
+
+    def summary(self):
+        parts = []
+        if self.video:
+            parts.append(f"{self.width}x{self.height}")
+            parts.append(f"{self.fps:.2f} fps")
+        seconds = int(self.duration)
+        parts.append(f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}")
+        parts.append('/'.join(s.codec_name for s in self.streams if s.codec_type in ('video', 'audio')))
+        return ' · '.join(parts)
+
+def _to_float(value, default=0.0):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+def _to_int(value, default=0):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+def _parse_rate(rate):
+    try:
+        value = Fraction(rate)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return 0.0
+    return float(value) if value > 0 else 0.0
+
+def _parse_rotation(stream):
+    for side_data in stream.get('side_data_list', []):
+        if 'rotation' in side_data:
+            return int(_to_float(side_data['rotation'])) % 360
+    return _to_int(stream.get('tags', {}).get('rotate')) % 360
+
+def _parse_stream(stream):
+    return StreamInfo(
+        index=_to_int(stream.get('index')),
+        codec_type=stream.get('codec_type', ''),
+        codec_name=stream.get('codec_name', ''),
+        width=_to_int(stream.get('width')),
+        height=_to_int(stream.get('height')),
+        fps=_parse_rate(stream.get('avg_frame_rate')) or _parse_rate(stream.get('r_frame_rate')),
+        pix_fmt=stream.get('pix_fmt', ''),
+        sample_rate=_to_int(stream.get('sample_rate')),
+        channels=_to_int(stream.get('channels')),
+        duration=_to_float(stream.get('duration')),
+        bit_rate=_to_int(stream.get('bit_rate')),
+        rotation=_parse_rotation(stream),
+    )
+
+def _run_ffprobe(path):
+    cmd = ['ffprobe', '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', path]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    except FileNotFoundError:
+        raise ProbeError("FFprobe not found. Please install FFmpeg and add it to PATH.")
+    if result.returncode != 0:
+        raise ProbeError(f"FFprobe error: {result.stderr.strip()}")
+    return json.loads(result.stdout or '{}')
+
+def _scan_keyframes(path):
+    cmd = ['ffprobe', '-v', 'error', '-select_streams', 'v:0', '-show_entries', 'packet=pts_time,flags',
+           '-of', 'csv=p=0', path]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise ProbeError(f"FFprobe error: {result.stderr.strip()}")
+    keyframes = []
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.partition(',')
+        if 'K' in flags and pts_time not in ('', 'N/A'):
+            keyframes.append(float(pts_time))
+    keyframes.sort()
+    return keyframes
+
+def probe(path):
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _lock:
+        info = _cache.get(key)
+    if info is not None:
+        return info
+    data = _run_ffprobe(path)
+    fmt = data.get('format', {})
+    streams = [_parse_stream(s) for s in data.get('streams', [])]
+    duration = _to_float(fmt.get('duration')) or max((s.duration for s in streams), default=0.0)
+    info = MediaInfo(
+        path=path,
+        duration=duration,
+        format_name=fmt.get('format_name', ''),
+        size=_to_int(fmt.get('size'), stat.st_size),
+        bit_rate=_to_int(fmt.get('bit_rate')),
+        streams=streams,
+    )
+    with _lock:
+        _cache[key] = info
+    return info
+
+def try_probe(path):
+    try:
+        return probe(path)
+    except (OSError, ProbeError, ValueError):
+        return None
+
+_TIME_RE = re.compile(r'time=(\d+):(\d+):(\d+(?:\.\d+)?)')
+_DURATION_RE = re.compile(r'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)')
+
+def _parse_clock(match):
+    if not match:
+        return None
+    hours, minutes, seconds = map(float, match.groups())
+    return hours * 3600 + minutes * 60 + seconds
+
+def parse_progress_time(line):
+    return _parse_clock(_TIME_RE.search(line))
+
+def parse_duration(line):
+    # ffmpeg prints the input duration in its banner; progress can use it when ffprobe is unavailable
+    return _parse_clock(_DURATION_RE.search(line))
@@ -0,0 +1,250 @@
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.utils import profiling
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# APPCUTSHORT_METRICS: path of the JSON-lines file, '-' for stderr; off unless set.
+# The file is rotated to <path>.1 once it passes METRICS_MAX_MB.
+METRICS_TARGET = os.environ.get('APPCUTSHORT_METRICS', 'off')
+METRICS_MAX_MB = int(os.environ.get('APPCUTSHORT_METRICS_MAX_MB', 50))
+METRICS_PORT = os.environ.get('APPCUTSHORT_METRICS_PORT')
+
+_lock = threading.Lock()
+_local = threading.local()
+_default_job = None
+_totals = {}
+_job_totals = {}
+
+def _peak_rss():
+    if resource:
+        scale = 1 if sys.platform == 'darwin' else 1024
+        own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+        child = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+        return own, child
+    if psutil:
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss), 0
+    return 0, 0
+
+def _child_cpu():
+    if resource:
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        return usage.ru_utime + usage.ru_stime
+    return 0.0
+
+def _io_counters():
+    if psutil:
+        try:
+            io = psutil.Process().io_counters()
+            return io.read_bytes, io.write_bytes
+        except (AttributeError, psutil.Error):
+            pass
+    try:
+        with open('/proc/self/io', 'r') as f:
+            fields = dict(line.split(': ') for line in f.read().splitlines())
+        return int(fields['read_bytes']), int(fields['write_bytes'])
+    except (OSError, KeyError, ValueError):
+        return 0, 0
+
+def _snapshot():
+    read_bytes, write_bytes = _io_counters()
+    return {
+        'wall': time.perf_counter(),
+        'cpu': time.process_time(),
+        'child_cpu': _child_cpu(),
+        'read_bytes': read_bytes,
+        'write_bytes': write_bytes,
+    }
+
+def emit(record):
+    if METRICS_TARGET == 'off':
+        return
+    line = json.dumps(record, ensure_ascii=False)
+    with _lock:
+        if METRICS_TARGET == '-':
+            print(line, file=sys.stderr, flush=True)
+            return
+        directory = os.path.dirname(METRICS_TARGET)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            if os.path.getsize(METRICS_TARGET) > METRICS_MAX_MB * 1024 * 1024:
+                os.replace(METRICS_TARGET, METRICS_TARGET + '.1')
+        except OSError:
+            pass
+        with open(METRICS_TARGET, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+class Job:
+    def __init__(self, name, job_id=None, profile=None):
+        self.name = name
+        self.job_id = job_id or uuid.uuid4().hex[:12]
+        self.stages = []
+        self.started = time.perf_counter()
+        # Job totals come from snapshots at start and finish: stages nest (artifact builds wrap transcription)
+        # and run in parallel, so summing stage records would count the same CPU time and bytes twice
+        self.before = _snapshot()
+        self.finished = False
+        # profile=None follows the global APPCUTSHORT_PROFILE / --profiling switch
+        profile = profiling.enabled() if profile is None else profile
+        self.profile = profiling.JobProfile(self.job_id, name) if profile else None
+
+    @contextlib.contextmanager
+    def stage(self, name, **fields):
+        before = _snapshot()
+        record = {'event': 'stage', 'job': self.job_id, 'stage': name, 'status': 'ok'}
+        record.update(fields)
+        try:
+            yield record
+        except BaseException:
+            record['status'] = 'error'
+            raise
+        finally:
+            after = _snapshot()
+            peak_rss, child_peak_rss = _peak_rss()
+            record.update({
+                'wall_s': round(after['wall'] - before['wall'], 4),
+                'cpu_s': round(after['cpu'] - before['cpu'], 4),
+                'child_cpu_s': round(after['child_cpu'] - before['child_cpu'], 4),
+                'peak_rss_bytes': peak_rss,
+                'child_peak_rss_bytes': child_peak_rss,
+                'read_bytes': after['read_bytes'] - before['read_bytes'],
+                'write_bytes': after['write_bytes'] - before['write_bytes'],
+            })
+            with _lock:
+                self.stages.append(record)
+                totals = _totals.setdefault(name, {'runs': 0, 'errors': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'child_cpu_s': 0.0})
+                totals['runs'] += 1
+                totals['errors'] += record['status'] == 'error'
+                totals['wall_s'] += record['wall_s']
+                totals['cpu_s'] += record['cpu_s']
+                totals['child_cpu_s'] += record['child_cpu_s']
+            emit(record)
+
+    def finish(self, status='ok'):
+        global _default_job
+        if self.finished:
+            return
+        self.finished = True
+        # Stages that run after this (filmstrip, waveform, cache builds) must not land in a finished job
+        with _lock:
+            if _default_job is self:
+                _default_job = None
+        if getattr(_local, 'job', None) is self:
+            _local.job = None
+        stages = {}
+        for record in self.stages:
+            stages[record['stage']] = round(stages.get(record['stage'], 0.0) + record['wall_s'], 4)
+        peak_rss, child_peak_rss = _peak_rss()
+        after = _snapshot()
+        with _lock:
+            _job_totals[status] = _job_totals.get(status, 0) + 1
+        profile = self.profile.write() if self.profile else None
+        emit({
+            'event': 'job',
+            'job': self.job_id,
+            'name': self.name,
+            'status': status,
+            'wall_s': round(after['wall'] - self.before['wall'], 4),
+            'cpu_s': round(after['cpu'] - self.before['cpu'], 4),
+            'child_cpu_s': round(after['child_cpu'] - self.before['child_cpu'], 4),
+            'read_bytes': after['read_bytes'] - self.before['read_bytes'],
+            'write_bytes': after['write_bytes'] - self.before['write_bytes'],
+            'peak_rss_bytes': peak_rss,
+            'child_peak_rss_bytes': child_peak_rss,
+            'stages': stages,
+            **({'profile': profile} if profile else {}),
+        })
+
+def start_job(name, job_id=None):
+    global _default_job
+    job = Job(name, job_id)
+    _default_job = job
+    _local.job = job
+    return job
+
+def current_job():
+    return getattr(_local, 'job', None) or _default_job
+
+@contextlib.contextmanager
+def use_job(job):
+    previous = getattr(_local, 'job', None)
+    _local.job = job
+    try:
+        yield job
+    finally:
+        _local.job = previous
+
+@contextlib.contextmanager
+def stage(name, **fields):
+    job = current_job()
+    if job is None:
+        job = Job('adhoc')
+    with job.stage(name, **fields) as record:
+        yield record
+
+def render_prometheus():
+    lines = []
+    with _lock:
+        totals = {name: dict(values) for name, values in _totals.items()}
+        jobs = dict(_job_totals)
+    for metric, key, help_text in [
+        ('appcutshort_stage_runs_total', 'runs', 'Number of completed stage runs'),
+        ('appcutshort_stage_errors_total', 'errors', 'Number of failed stage runs'),
+        ('appcutshort_stage_wall_seconds_total', 'wall_s', 'Wall time spent per stage'),
+        ('appcutshort_stage_cpu_seconds_total', 'cpu_s', 'Python process CPU time spent per stage'),
+        ('appcutshort_stage_child_cpu_seconds_total', 'child_cpu_s', 'Child process (ffmpeg) CPU time spent per stage'),
+    ]:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for name, values in sorted(totals.items()):
+            lines.append(f'{metric}{{stage="{name}"}} {values[key]}')
+    lines.append("# HELP appcutshort_jobs_total Number of finished jobs by status")
+    lines.append("# TYPE appcutshort_jobs_total counter")
+    for status, count in sorted(jobs.items()):
+        lines.append(f'appcutshort_jobs_total{{status="{status}"}} {count}')
+    peak_rss, child_peak_rss = _peak_rss()
+    lines.append("# HELP appcutshort_peak_rss_bytes Peak resident set size of this process")
+    lines.append("# TYPE appcutshort_peak_rss_bytes gauge")
+    lines.append(f"appcutshort_peak_rss_bytes {peak_rss}")
+    lines.append("# HELP appcutshort_child_peak_rss_bytes Peak resident set size of the largest child process")
+    lines.append("# TYPE appcutshort_child_peak_rss_bytes gauge")
+    lines.append(f"appcutshort_child_peak_rss_bytes {child_peak_rss}")
+    return '\n'.join(lines) + '\n'
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip('/') not in ('', '/metrics'):
+            self.send_error(404)
+            return
+        body = render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_metrics_server(port=None, host='127.0.0.1'):
+    port = int(port or METRICS_PORT or 9464)
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,159 @@
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+
+# APPCUTSHORT_PROFILE=1 profiles every job: each thread the job runs on gets its own cProfile
+# and ffmpeg runs with -benchmark; the merged .prof and a top-N summary land in PROFILE_DIR
+PROFILE = os.environ.get('APPCUTSHORT_PROFILE', '') == '1'
+PROFILE_DIR = os.environ.get('APPCUTSHORT_PROFILE_DIR', os.path.join('temp', 'profiles'))
+TOP_N = int(os.environ.get('APPCUTSHORT_PROFILE_TOP', 25))
+
+# From 3.12 cProfile sits on sys.monitoring: one profiler per process, and it sees every thread.
+# There the first thread of a job profiles for all of them and other jobs run unprofiled meanwhile.
+SHARED_PROFILER = sys.version_info >= (3, 12)
+
+_enabled = PROFILE
+_local = threading.local()
+_owner = None
+_owner_lock = threading.Lock()
+
+def enable():
+    global _enabled
+    _enabled = True
+
+def enabled():
+    return _enabled
+
+def parse_benchmark(line):
+    # "bench: utime=1.234s stime=0.120s rtime=2.001s" / "bench: maxrss=123456KiB"
+    fields = {}
+    for item in line.split('bench:', 1)[1].split():
+        name, _, value = item.partition('=')
+        number = value.rstrip('sKiB')
+        try:
+            fields[name] = float(number)
+        except ValueError:
+            continue
+    return fields
+
+class JobProfile:
+    def __init__(self, job_id, name):
+        self.job_id = job_id
+        self.name = name
+        self.stats = None
+        self.ffmpeg = []
+        self.notes = []
+        self.path = os.path.join(PROFILE_DIR, f"{name}-{job_id}.prof")
+        self.summary_path = os.path.join(PROFILE_DIR, f"{name}-{job_id}.txt")
+        self._lock = threading.Lock()
+
+    def _claim(self):
+        global _owner
+        if not SHARED_PROFILER:
+            return True
+        with _owner_lock:
+            if _owner is None:
+                _owner = self
+                return True
+            busy = _owner is not self
+        if busy:
+            self.note("another job held the process profiler; part of this job ran unprofiled")
+        return False
+
+    def _release(self):
+        global _owner
+        if SHARED_PROFILER:
+            with _owner_lock:
+                _owner = None
+
+    def note(self, text):
+        with self._lock:
+            if text not in self.notes:
+                self.notes.append(text)
+
+    @contextlib.contextmanager
+    def thread(self):
+        # Before 3.12 cProfile only sees the thread it was enabled on, so each job thread gets one and
+        # they are merged. Profiling must never fail the job, so a profiler that won't start is skipped.
+        if getattr(_local, 'active', False) or not self._claim():
+            yield
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            self._release()
+            self.note(f"profiler unavailable: {e}")
+            yield
+            return
+        _local.active = True
+        try:
+            yield
+        finally:
+            profiler.disable()
+            _local.active = False
+            self._release()
+            with self._lock:
+                try:
+                    if self.stats is None:
+                        self.stats = pstats.Stats(profiler)
+                    else:
+                        self.stats.add(profiler)
+                except TypeError:
+                    # Nothing was recorded on this thread
+                    pass
+
+    def add_ffmpeg(self, label, line):
+        with self._lock:
+            if self.ffmpeg and self.ffmpeg[-1]['label'] == label and 'maxrss' not in self.ffmpeg[-1]:
+                self.ffmpeg[-1].update(parse_benchmark(line))
+            else:
+                self.ffmpeg.append({'label': label, **parse_benchmark(line)})
+
+    def summary(self):
+        lines = [f"Profile for {self.name} job {self.job_id}", ""]
+        if self.notes:
+            lines += [f"Note: {note}" for note in self.notes] + [""]
+        if self.ffmpeg:
+            lines.append("ffmpeg -benchmark:")
+            for run in self.ffmpeg:
+                lines.append(f"  {run['label']}: utime={run.get('utime', 0):.2f}s stime={run.get('stime', 0):.2f}s "
+                             f"rtime={run.get('rtime', 0):.2f}s maxrss={run.get('maxrss', 0) / 1024:.0f}MiB")
+            lines.append("")
+        if self.stats:
+            for order in ('cumulative', 'tottime'):
+                stream = io.StringIO()
+                self.stats.stream = stream
+                self.stats.sort_stats(order).print_stats(TOP_N)
+                lines.append(f"Top {TOP_N} by {order} time:")
+                lines.append(stream.getvalue().strip())
+                lines.append("")
+        return '\n'.join(lines)
+
+    def write(self):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        with self._lock:
+            if self.stats:
+                self.stats.dump_stats(self.path)
+            with open(self.summary_path, 'w', encoding='utf-8') as f:
+                f.write(self.summary())
+        return self.summary_path
+
+@contextlib.contextmanager
+def thread(job):
+    if job is None or job.profile is None:
+        yield
+        return
+    with job.profile.thread():
+        yield
+
+def ffmpeg_args(job):
+    return ['-benchmark'] if job is not None and job.profile is not None else []
+
+def record_ffmpeg(job, label, line):
+    if job is not None and job.profile is not None and line.startswith('bench:'):
+        job.profile.add_ffmpeg(label, line)
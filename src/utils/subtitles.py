@@ -0,0 +1,40 @@
+import re
+
+def format_timestamp(seconds):
+    return f"{int(seconds//3600):02d}:{int((seconds%3600)//60):02d}:{seconds%60:06.3f}".replace('.', ',')
+
+def parse_timestamp(timestamp):
+    parts = timestamp.strip().replace(',', '.').split(':')
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+def parse_time_ranges(text):
+    ranges = []
+    for item in re.split(r'[,;\n]+', text):
+        item = item.strip()
+        if not item:
+            continue
+        start, sep, end = item.partition('-')
+        if not sep:
+            raise ValueError(f"Invalid clip range: {item}")
+        start, end = parse_timestamp(start), parse_timestamp(end)
+        if end <= start:
+            raise ValueError(f"Clip end must be after start: {item}")
+        ranges.append((start, end))
+    return ranges
+
+def write_srt(subtitles, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        for i, (start, end, text) in enumerate(subtitles, 1):
+            f.write(f"{i}\n{start} --> {end}\n{text}\n\n")
+
+def slice_subtitles(subtitles, start, end):
+    sliced = []
+    for sub_start, sub_end, text in subtitles:
+        sub_start, sub_end = parse_timestamp(sub_start), parse_timestamp(sub_end)
+        if sub_end <= start or sub_start >= end:
+            continue
+        sliced.append((format_timestamp(max(sub_start, start) - start), format_timestamp(min(sub_end, end) - start), text))
+    return sliced
@@ -1,22 +1,124 @@
 import os
+import random
+import re
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from yt_dlp import YoutubeDL
+from src.utils import metrics
+from src.utils.artifact_store import store
+
+FORMAT = '18'  # Sử dụng định dạng MP4 360p để tránh lỗi nsig
+VIDEO_ID = re.compile(r'(?:v=|youtu\.be/|/shorts/|/embed/|/live/)([\w-]{11})')
+DOWNLOAD_WORKERS = int(os.environ.get('APPCUTSHORT_DOWNLOAD_WORKERS', 4))
+RETRIES = 3
+BACKOFF = 2.0
+
+class YtDlpExtractor:
+    def extract(self, url, flat=False):
+        ydl_opts = {'format': FORMAT, 'quiet': True}
+        if flat:
+            # Playlist and channel entries come back as bare URLs without resolving each video
+            ydl_opts['extract_flat'] = 'in_playlist'
+        with YoutubeDL(ydl_opts) as ydl:
+            return ydl.extract_info(url, download=False)
+
+    def download(self, info, path):
+        ydl_opts = {
+            'format': FORMAT,
+            'outtmpl': path,
+            'merge_output_format': 'mp4',
+            # The .part file next to path survives a failed attempt and the next one continues it
+            'continuedl': True,
+            'quiet': True,
+        }
+        with YoutubeDL(ydl_opts) as ydl:
+            ydl.process_ie_result(info, download=True)
+
+    def download_thumbnail(self, info, path):
+        # Prefer a JPEG rendition; QPixmap may lack a WebP plugin
+        urls = [t['url'] for t in info.get('thumbnails') or [] if t.get('url', '').split('?')[0].endswith('.jpg')]
+        urllib.request.urlretrieve(urls[-1] if urls else info['thumbnail'], path)
+
+extractor = YtDlpExtractor()
+
+def video_key(video_id):
+    return store.key('youtube', video_id, FORMAT)
+
+def thumbnail_key(video_id):
+    return store.key('thumbnail', video_id)
+
+def fetch_video(url, thumbnail_only=False, source=None):
+    source = source or extractor
+    with metrics.stage('thumbnail' if thumbnail_only else 'download', url=url) as record:
+        # A video ID in the URL lets a cached download skip the extractor's network round trip entirely
+        match = VIDEO_ID.search(url)
+        if match:
+            cached = store.get(thumbnail_key(match.group(1)), '.jpg') if thumbnail_only \
+                else store.get(video_key(match.group(1)), '.mp4')
+            if cached:
+                record['cache_hit'] = True
+                return cached
+        record['cache_hit'] = False
+        info = source.extract(url)
+        if thumbnail_only:
+            return store.produce(thumbnail_key(info['id']), '.jpg', lambda path: source.download_thumbnail(info, path))
+        return store.produce(video_key(info['id']), '.mp4', lambda path: source.download(info, path))
 
 def download_youtube_video(url, thumbnail_only=False):
-    output_path = os.path.join('temp', 'downloaded_video.mp4')
-    thumbnail_path = os.path.join('temp', 'thumbnail.jpg')
-    ydl_opts = {
-        'format': '18',  # Sử dụng định dạng MP4 360p để tránh lỗi nsig
-        'outtmpl': output_path,
-        'merge_output_format': 'mp4',
-        'writethumbnail': True,
-        'skip_download': thumbnail_only,
-    }
     try:
-        with YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=not thumbnail_only)
-            if thumbnail_only:
-                return thumbnail_path if os.path.exists(thumbnail_path) else None
-            return output_path if os.path.exists(output_path) else None
+        return fetch_video(url, thumbnail_only)
     except Exception as e:
         print(f"Error downloading: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def _entry_urls(info, source):
+    if not info.get('entries'):
+        yield info.get('webpage_url') or info.get('url')
+        return
+    for entry in info['entries']:
+        if not entry:
+            continue
+        if entry.get('entries'):
+            yield from _entry_urls(entry, source)
+        elif entry.get('ie_key') == 'YoutubeTab' or entry.get('_type') == 'playlist':
+            # Channel pages list their tabs (videos, shorts, ...) as nested playlists
+            yield from _entry_urls(source.extract(entry['url'], flat=True), source)
+        else:
+            yield entry.get('url') or f"https://www.youtube.com/watch?v={entry['id']}"
+
+def expand_urls(url, source=None):
+    source = source or extractor
+    if VIDEO_ID.search(url) and 'list=' not in url:
+        return [url]
+    with metrics.stage('expand', url=url) as record:
+        urls = list(dict.fromkeys(u for u in _entry_urls(source.extract(url, flat=True), source) if u))
+        record['videos'] = len(urls)
+    return urls
+
+def _fetch_with_retries(url, source, retries, backoff):
+    for attempt in range(retries + 1):
+        try:
+            return fetch_video(url, source=source)
+        except Exception:
+            if attempt == retries:
+                raise
+            # Exponential backoff with jitter so parallel workers don't retry in lockstep
+            time.sleep(backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+
+def download_many(urls, on_result=None, workers=DOWNLOAD_WORKERS, retries=RETRIES, backoff=BACKOFF, source=None):
+    # on_result(url, path, error) fires as each video finishes, so jobs can start before the batch is done
+    source = source or extractor
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='download') as executor:
+        futures = {executor.submit(_fetch_with_retries, url, source, retries, backoff): url for url in urls}
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                path, error = future.result(), None
+            except Exception as e:
+                path, error = None, str(e)
+            results[url] = path
+            if on_result:
+                on_result(url, path, error)
+    return [results[url] for url in urls]
@@ -0,0 +1,28 @@
+import os
+import sys
+import tempfile
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('APPCUTSHORT_METRICS', 'off')
+os.environ.setdefault('APPCUTSHORT_CACHE_DIR', tempfile.mkdtemp(prefix='appcutshort-cache-'))
+
+# Tests run on benchmarks.mocks models and never open a window, so Whisper, transformers and Qt only
+# have to be importable; empty modules stand in for the ones that are not installed
+try:
+    import whisper
+except ImportError:
+    sys.modules['whisper'] = types.ModuleType('whisper')
+try:
+    import transformers
+except ImportError:
+    sys.modules['transformers'] = types.ModuleType('transformers')
+    sys.modules['transformers'].pipeline = None
+try:
+    import PyQt6.QtCore
+except ImportError:
+    qt_core = types.ModuleType('PyQt6.QtCore')
+    qt_core.QThread = type('QThread', (), {'__init__': lambda self, *args: None})
+    qt_core.pyqtSignal = lambda *types: None
+    sys.modules['PyQt6'] = types.ModuleType('PyQt6')
+    sys.modules['PyQt6.QtCore'] = qt_core
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from benchmarks.asr_backends import check_segments, run_backend
+from benchmarks.media import generate_audio
+from benchmarks.mocks import mock_models
+from src.processing.asr import BACKENDS, get_backend
+from src.processing.audio_stream import decode_pcm, open_pcm
+
+DURATION = 40
+
+@pytest.fixture(scope='module')
+def sample(tmp_path_factory):
+    work_dir = str(tmp_path_factory.mktemp('asr'))
+    source = generate_audio(work_dir, DURATION)
+    samples = open_pcm(decode_pcm(source, f"{work_dir}/sample.pcm"))
+    return source, samples
+
+@pytest.mark.parametrize('name', list(BACKENDS))
+def test_backend_meets_interface(name, sample):
+    source, samples = sample
+    with mock_models():
+        asr = get_backend(name)
+        assert asr.name == name
+        assert isinstance(asr.model_id, str) and asr.model_id
+        _, failures = run_backend(asr, source, samples, len(samples) / 16000)
+        assert failures == []
+
+@pytest.mark.parametrize('name', list(BACKENDS))
+def test_backend_returns_words_only_when_asked(name, sample):
+    _, samples = sample
+    clip = samples[:10 * 16000].astype(np.float32) / 32768.0
+    with mock_models():
+        asr = get_backend(name)
+        plain = asr.transcribe(clip)
+        worded = asr.transcribe(clip, words=True)
+    assert plain and all('words' not in segment for segment in plain)
+    assert check_segments(worded, 10, name, words=True) == []
+    assert all(segment['words'] for segment in worded)
@@ -0,0 +1,65 @@
+import os
+import threading
+from http.server import ThreadingHTTPServer
+import pytest
+from benchmarks.playlist_check import FakeExtractor, StandIn, payload
+from src.utils import youtube_downloader
+from src.utils.artifact_store import PARTIAL_TTL, ArtifactStore
+
+VIDEO_IDS = ['video00', 'video01', 'video02', 'video03', 'flaky01', 'broken01']
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    monkeypatch.setattr(StandIn, 'requests', [])
+    monkeypatch.setattr(StandIn, 'dropped', set())
+    monkeypatch.setattr(youtube_downloader, 'store', ArtifactStore(str(tmp_path), quota_mb=1024))
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield FakeExtractor(f"http://127.0.0.1:{server.server_address[1]}", VIDEO_IDS)
+    server.shutdown()
+
+def test_expand_channel_offline(source):
+    urls = youtube_downloader.expand_urls('fake://channel', source)
+    assert sorted(urls) == sorted(f"fake://{video_id}" for video_id in VIDEO_IDS)
+
+def test_expand_single_video_skips_extractor(source):
+    url = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+    assert youtube_downloader.expand_urls(url, source) == [url]
+
+def test_download_many_resumes_and_retries(source):
+    urls = [f"fake://{video_id}" for video_id in VIDEO_IDS]
+    errors = {}
+    paths = youtube_downloader.download_many(urls, lambda url, path, error: errors.setdefault(url, error),
+                                             workers=3, retries=2, backoff=0.01, source=source)
+    for video_id, path in zip(VIDEO_IDS, paths):
+        if video_id.startswith('broken'):
+            assert path is None and errors[f"fake://{video_id}"]
+        else:
+            assert open(path, 'rb').read() == payload(video_id)
+    assert any(offset for video_id, offset in StandIn.requests if video_id == 'flaky01')
+    assert sum(1 for video_id, _ in StandIn.requests if video_id == 'broken01') == 3
+    assert 1 < source.peak <= 3
+
+def test_cached_download_is_reused(source):
+    first = youtube_downloader.download_many(['fake://video00'], source=source)
+    requests = len(StandIn.requests)
+    assert youtube_downloader.download_many(['fake://video00'], source=source) == first
+    assert len(StandIn.requests) == requests
+
+def test_stale_partials_count_and_expire(tmp_path):
+    store = ArtifactStore(str(tmp_path), quota_mb=1)
+    os.makedirs(tmp_path / 'aa')
+    stale, fresh = tmp_path / 'aa' / 'stale.tmp.mp4.part', tmp_path / 'aa' / 'fresh.tmp.mp4.part'
+    stale.write_bytes(b'x' * 600 * 1024)
+    fresh.write_bytes(b'x' * 600 * 1024)
+    os.utime(stale, (0, 0))
+    assert store.usage() == 1200 * 1024
+    store.evict()
+    assert not stale.exists()
+    # Over quota on its own, but a fresh partial may still be resumed
+    fresh.write_bytes(b'x' * 1200 * 1024)
+    store.evict()
+    assert fresh.exists()
+    os.utime(fresh, (os.path.getmtime(fresh) - PARTIAL_TTL - 1,) * 2)
+    store.evict()
+    assert not fresh.exists()
@@ -0,0 +1,25 @@
+import tracemalloc
+from benchmarks.media import generate_audio
+from benchmarks.mocks import mock_models
+from src.processing import ai_processor
+from src.processing.asr import get_backend
+from src.utils.subtitles import parse_timestamp
+
+DURATION = 20 * 60
+# Decoding the whole input up front would hold DURATION * 16000 float32 samples (~77 MB)
+CEILING_MB = 16
+
+def test_streaming_stays_under_memory_ceiling(tmp_path):
+    source = generate_audio(str(tmp_path), DURATION)
+    with mock_models():
+        get_backend('whisper').load()
+        tracemalloc.start()
+        try:
+            subtitles = list(ai_processor.stream_subtitles(source, backend='whisper'))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    assert peak < CEILING_MB * 1024 * 1024, f"peak {peak / 1024 / 1024:.1f} MB"
+    assert parse_timestamp(subtitles[-1][1]) > DURATION - ai_processor.STREAM_WINDOW
+    starts = [parse_timestamp(start) for start, _, _ in subtitles]
+    assert starts == sorted(starts)